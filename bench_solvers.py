@@ -0,0 +1,160 @@
+import argparse
+import contextlib
+import io
+import json
+import random
+import time
+from typing import List, Tuple
+
+import inference
+import inference_engine
+from cdcl_solver import CDCLSolver
+from dpll_solver import HEURISTICS, IterativeDPLL
+from environment import Environment
+from hybrid_agent import HybridAgent
+from inference import KnowledgeBase, IntClause
+from run_hybrid_testcases import load_map, run_test
+
+Problem = List[IntClause] # KB clauses + negated query, as handed to the solver
+
+
+class RecordingKnowledgeBase(KnowledgeBase):
+    """KnowledgeBase that keeps a copy of every (KB AND ~query) problem it solves."""
+    recorded: List[Problem] = []
+    instances: List[KnowledgeBase] = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        RecordingKnowledgeBase.instances.append(self)
+
+    def _cache_store(self, query_key, entailed: bool):
+        # Called once for every verdict the KB had to work out (not for cache hits)
+        negated_query_clause = tuple(-lit for lit in query_key)
+        RecordingKnowledgeBase.recorded.append(list(self.arena) + [negated_query_clause])
+        super()._cache_store(query_key, entailed)
+
+
+def capture_problems(num_maps: int, seed: int) -> List[Problem]:
+    """Run HybridAgent on testcases/map*.json and return every entailment problem it solved."""
+    RecordingKnowledgeBase.recorded = []
+    RecordingKnowledgeBase.instances = []
+    original_kb = inference_engine.KnowledgeBase
+    inference_engine.KnowledgeBase = RecordingKnowledgeBase
+    try:
+        for i in range(num_maps):
+            random.seed(seed) # Moving wumpus mode is random
+            map_config = load_map(f'testcases/map{i + 1}.json')
+            env = Environment(size=map_config["Size"],
+                              world_matrix=map_config["WorldMatrix"],
+                              moving_wumpus_mode=map_config["MovingWumpusMode"])
+            with contextlib.redirect_stdout(io.StringIO()):
+                run_test(env, HybridAgent)
+    finally:
+        inference_engine.KnowledgeBase = original_kb
+    return RecordingKnowledgeBase.recorded
+
+
+def bench_recursive(problems: List[Problem]) -> Tuple[float, int, int]:
+    """Time the recursive int DPLL. Every recursive call assigns one symbol."""
+    calls = 0
+    original_dpll = inference.int_dpll
+
+    def counting_dpll(clauses, model, stats=None, budget=None):
+        nonlocal calls
+        calls += 1
+        return original_dpll(clauses, model, stats, budget)
+
+    inference.int_dpll = counting_dpll
+    try:
+        start = time.perf_counter()
+        unsat = sum(1 for p in problems if inference.int_dpll_satisfiable(p) is False)
+        elapsed = time.perf_counter() - start
+    finally:
+        inference.int_dpll = original_dpll
+    return elapsed, calls, unsat
+
+
+def bench_iterative(problems: List[Problem]) -> Tuple[float, int, int]:
+    assignments = 0
+    unsat = 0
+    start = time.perf_counter()
+    for p in problems:
+        solver = IterativeDPLL(p)
+        if solver.solve() is None:
+            unsat += 1
+        assignments += solver.decisions + solver.propagations
+    return time.perf_counter() - start, assignments, unsat
+
+
+def bench_heuristic(problems: List[Problem], heuristic: str) -> Tuple[float, int, int, int]:
+    """Time IterativeDPLL with one branching heuristic. Nodes are decisions of the search tree."""
+    nodes = 0
+    conflicts = 0
+    unsat = 0
+    start = time.perf_counter()
+    for p in problems:
+        solver = IterativeDPLL(p, heuristic)
+        if solver.solve() is None:
+            unsat += 1
+        nodes += solver.decisions
+        conflicts += solver.conflicts
+    return time.perf_counter() - start, nodes, conflicts, unsat
+
+
+def bench_cdcl(problems: List[Problem]) -> Tuple[float, int, int]:
+    assignments = 0
+    unsat = 0
+    start = time.perf_counter()
+    for p in problems:
+        solver = CDCLSolver(p)
+        if not solver.solve():
+            unsat += 1
+        assignments += solver.decisions + solver.propagations
+    return time.perf_counter() - start, assignments, unsat
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark DPLL variants on KBs captured from HybridAgent runs.")
+    parser.add_argument("--maps", type=int, default=5, help="number of testcases/map*.json to replay")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="optional JSON file for the results")
+    args = parser.parse_args()
+
+    problems = capture_problems(args.maps, args.seed)
+    print(f"Captured {len(problems)} entailment problems "
+          f"(avg {sum(len(p) for p in problems) / max(1, len(problems)):.1f} clauses)")
+    cache_hits = sum(kb.cache_hits for kb in RecordingKnowledgeBase.instances)
+    cache_misses = sum(kb.cache_misses for kb in RecordingKnowledgeBase.instances)
+    pool_hits = sum(kb.model_pool_hits for kb in RecordingKnowledgeBase.instances)
+    unit_hits = sum(kb.unit_hits for kb in RecordingKnowledgeBase.instances)
+    print(f"KB entailment cache during capture: {cache_hits} hits, {cache_misses} misses, "
+          f"{pool_hits} refuted by pooled models, {unit_hits} entailed by unit propagation")
+
+    results = {}
+    for name, bench in [("recursive", bench_recursive), ("iterative", bench_iterative), ("cdcl", bench_cdcl)]:
+        elapsed, assignments, unsat = bench(problems)
+        results[name] = {
+            "time_s": round(elapsed, 4),
+            "assignments": assignments,
+            "assignments_per_s": round(assignments / elapsed) if elapsed > 0 else 0,
+            "unsat": unsat,
+        }
+        print(f"{name:>10}: {elapsed * 1000:10.1f} ms  {assignments:10d} assignments  "
+              f"{results[name]['assignments_per_s']:10d} assignments/s  {unsat} entailed")
+
+    print("Branching heuristics (iterative engine):")
+    results["heuristics"] = {}
+    for heuristic in HEURISTICS:
+        elapsed, nodes, conflicts, unsat = bench_heuristic(problems, heuristic)
+        results["heuristics"][heuristic] = {
+            "time_s": round(elapsed, 4),
+            "nodes": nodes,
+            "conflicts": conflicts,
+            "unsat": unsat,
+        }
+        print(f"{heuristic:>10}: {elapsed * 1000:10.1f} ms  {nodes:10d} nodes  "
+              f"{conflicts:10d} conflicts  {unsat} entailed")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=4)
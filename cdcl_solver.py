@@ -0,0 +1,339 @@
+import heapq
+from typing import List, Optional, Sequence, Tuple
+
+from search_budget import BudgetExhausted, SearchBudget
+
+ClauseRef = List[int] # Clauses are mutable lists, the two watched literals sit at index 0 and 1
+
+
+def luby(i: int) -> int:
+    """i-th element (from 0) of the Luby restart sequence 1, 1, 2, 1, 1, 2, 4, ..."""
+    size, seq = 1, 0
+    while size < i + 1:
+        seq += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) >> 1
+        seq -= 1
+        i = i % size
+    return 1 << seq
+
+
+class CDCLSolver:
+    """
+    Conflict-driven clause-learning SAT solver over int literals (+var / -var).
+
+    - two-watched-literal unit propagation
+    - 1-UIP conflict analysis with non-chronological backjumping
+    - VSIDS variable activity with phase saving
+    - Luby restarts and periodic deletion of long learnt clauses
+    """
+    RESTART_BASE = 100 # Conflicts per Luby unit
+    VAR_DECAY = 0.95
+    LEARNT_LIMIT = 2000 # Learnt clauses kept before reduce_db halves them
+
+    def __init__(self, clauses: Sequence[Sequence[int]] = ()):
+        self.num_vars = 0
+        self.assigns: List[int] = [0] # Per var: 1 true, -1 false, 0 unassigned
+        self.level: List[int] = [0]
+        self.reason: List[Optional[ClauseRef]] = [None]
+        self.activity: List[float] = [0.0]
+        self.polarity: List[bool] = [False] # Saved phase, False first since most cells hold no pit/wumpus
+        self.seen: List[bool] = [False]
+        self.used: List[bool] = [False] # Whether the var occurs in some added clause
+        self.watches: dict = {} # literal -> clauses watching it
+
+        self.clauses: List[ClauseRef] = []
+        self.learnts: List[ClauseRef] = []
+        self.trail: List[int] = []
+        self.trail_lim: List[int] = []
+        self.qhead = 0
+        self.order_heap: List[Tuple[float, int]] = []
+        self.var_inc = 1.0
+        self.ok = True # False once the clauses are unsatisfiable at level 0
+        self.model: List[int] = []
+
+        self.decisions = 0
+        self.propagations = 0
+        self.conflicts = 0
+        self.restarts = 0
+        self.clauses_scanned = 0
+        self.max_depth = 0 # Deepest decision level reached
+
+        for clause in clauses:
+            self.add_clause(clause)
+
+    # Variables and assignment
+
+    def _ensure_var(self, var: int):
+        while self.num_vars < var:
+            self.num_vars += 1
+            self.assigns.append(0)
+            self.level.append(0)
+            self.reason.append(None)
+            self.activity.append(0.0)
+            self.polarity.append(False)
+            self.seen.append(False)
+            self.used.append(False)
+            heapq.heappush(self.order_heap, (0.0, self.num_vars))
+
+    def _lit_value(self, lit: int) -> int:
+        val = self.assigns[abs(lit)]
+        return val if lit > 0 else -val
+
+    def _decision_level(self) -> int:
+        return len(self.trail_lim)
+
+    def _assign(self, lit: int, reason: Optional[ClauseRef]):
+        var = abs(lit)
+        self.assigns[var] = 1 if lit > 0 else -1
+        self.level[var] = len(self.trail_lim)
+        self.reason[var] = reason
+        self.trail.append(lit)
+
+    def _cancel_until(self, level: int):
+        if len(self.trail_lim) <= level:
+            return
+        start = self.trail_lim[level]
+        for lit in self.trail[start:]:
+            var = abs(lit)
+            self.polarity[var] = lit > 0
+            self.assigns[var] = 0
+            self.reason[var] = None
+            heapq.heappush(self.order_heap, (-self.activity[var], var))
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        self.qhead = start
+
+    # Clauses
+
+    def add_clause(self, lits: Sequence[int]) -> bool:
+        """Add a clause at decision level 0. Returns False if the solver became unsatisfiable."""
+        if not self.ok:
+            return False
+        self._cancel_until(0)
+        self._ensure_var(max(abs(lit) for lit in lits) if lits else 0)
+        for lit in lits:
+            self.used[abs(lit)] = True
+        clause: ClauseRef = []
+        for lit in set(lits):
+            if -lit in lits:
+                return True # Tautology
+            val = self._lit_value(lit)
+            if val > 0:
+                return True # Already satisfied at level 0
+            if val == 0:
+                clause.append(lit)
+
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self._assign(clause[0], None)
+            self.ok = self._propagate() is None
+        else:
+            self.clauses.append(clause)
+            self._watch(clause)
+        return self.ok
+
+    def _watch(self, clause: ClauseRef):
+        self.watches.setdefault(clause[0], []).append(clause)
+        self.watches.setdefault(clause[1], []).append(clause)
+
+    def _propagate(self) -> Optional[ClauseRef]:
+        """Two-watched-literal unit propagation. Returns the conflicting clause, if any."""
+        assigns = self.assigns
+        trail = self.trail
+        while self.qhead < len(trail):
+            false_lit = -trail[self.qhead]
+            self.qhead += 1
+            watchers = self.watches.get(false_lit)
+            if not watchers:
+                continue
+            kept = []
+            i = 0
+            n = len(watchers)
+            self.clauses_scanned += n
+            while i < n:
+                clause = watchers[i]
+                i += 1
+                if not clause:
+                    continue # Deleted learnt clause, drop the watch
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], false_lit
+                first = clause[0]
+                val = assigns[abs(first)]
+                if val != 0 and (val > 0) == (first > 0):
+                    kept.append(clause) # Clause already true
+                    continue
+                # Look for a new literal to watch
+                for k in range(2, len(clause)):
+                    lit = clause[k]
+                    val = assigns[abs(lit)]
+                    if val == 0 or (val > 0) == (lit > 0):
+                        clause[1], clause[k] = lit, false_lit
+                        self.watches.setdefault(lit, []).append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if assigns[abs(first)] != 0:
+                        # Conflict: keep the remaining watchers and stop
+                        kept.extend(watchers[i:])
+                        self.watches[false_lit] = kept
+                        self.qhead = len(trail)
+                        return clause
+                    self.propagations += 1
+                    self._assign(first, clause)
+            self.watches[false_lit] = kept
+        return None
+
+    # Conflict analysis
+
+    def _bump(self, var: int):
+        self.activity[var] += self.var_inc
+        if self.activity[var] > 1e100:
+            for v in range(1, self.num_vars + 1):
+                self.activity[v] *= 1e-100
+            self.var_inc *= 1e-100
+            self.order_heap = [(-self.activity[v], v) for v in range(1, self.num_vars + 1) if self.assigns[v] == 0]
+            heapq.heapify(self.order_heap)
+        elif self.assigns[var] == 0:
+            heapq.heappush(self.order_heap, (-self.activity[var], var))
+
+    def _analyze(self, conflict: ClauseRef) -> Tuple[List[int], int]:
+        """1-UIP learning. Returns the learnt clause (asserting literal first) and the backjump level."""
+        seen = self.seen
+        level = self.level
+        current_level = len(self.trail_lim)
+        learnt = [0]
+        counter = 0
+        p = 0
+        idx = len(self.trail) - 1
+        clause = conflict
+
+        while True:
+            for q in (clause if p == 0 else clause[1:]):
+                var = abs(q)
+                if not seen[var] and level[var] > 0:
+                    seen[var] = True
+                    self._bump(var)
+                    if level[var] >= current_level:
+                        counter += 1
+                    else:
+                        learnt.append(q)
+            # Next literal of the current level on the trail
+            while not seen[abs(self.trail[idx])]:
+                idx -= 1
+            p = self.trail[idx]
+            idx -= 1
+            clause = self.reason[abs(p)]
+            seen[abs(p)] = False
+            counter -= 1
+            if counter == 0:
+                break
+
+        learnt[0] = -p
+        for lit in learnt[1:]:
+            seen[abs(lit)] = False
+
+        if len(learnt) == 1:
+            return learnt, 0
+        # Put the literal with the highest level in the second watch position
+        max_i = max(range(1, len(learnt)), key=lambda i: level[abs(learnt[i])])
+        learnt[1], learnt[max_i] = learnt[max_i], learnt[1]
+        return learnt, level[abs(learnt[1])]
+
+    def _reduce_db(self):
+        """Delete the longer half of the learnt clauses that are not a reason for an assignment."""
+        self.learnts.sort(key=len)
+        keep = self.learnts[:len(self.learnts) // 2]
+        for clause in self.learnts[len(self.learnts) // 2:]:
+            if len(clause) > 2 and self.reason[abs(clause[0])] is not clause:
+                clause.clear() # Watchers drop cleared clauses lazily
+            else:
+                keep.append(clause)
+        self.learnts = keep
+
+    def _pick_branch_lit(self) -> int:
+        heap = self.order_heap
+        while heap:
+            _, var = heapq.heappop(heap)
+            if self.assigns[var] == 0:
+                return var if self.polarity[var] else -var
+        return 0
+
+    # Solving
+
+    def solve(self, assumptions: Sequence[int] = (), budget: Optional[SearchBudget] = None) -> bool:
+        """
+        Return True if the clauses are satisfiable with every assumption literal true;
+        the model (over the variables that occur in clauses) is then in self.model. Assumptions are taken as the first decisions
+        and are not kept afterwards, while learnt clauses, activities and saved phases
+        stay in the solver for the next call.
+        If the budget runs out, the solver goes back to level 0 and BudgetExhausted is raised.
+        """
+        if not self.ok:
+            return False
+        self._cancel_until(0)
+        for lit in assumptions:
+            self._ensure_var(abs(lit))
+        restart_count = 0
+        conflicts_left = luby(restart_count) * self.RESTART_BASE
+        charged = self.propagations # Propagations already charged to the budget
+
+        while True:
+            conflict = self._propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                conflicts_left -= 1
+                if self._decision_level() == 0:
+                    self.ok = False
+                    return False
+                learnt, backjump_level = self._analyze(conflict)
+                self._cancel_until(backjump_level)
+                if len(learnt) == 1:
+                    self._assign(learnt[0], None)
+                else:
+                    self.learnts.append(learnt)
+                    self._watch(learnt)
+                    self._assign(learnt[0], learnt)
+                self.var_inc /= self.VAR_DECAY
+                continue
+
+            if conflicts_left <= 0:
+                self.restarts += 1
+                restart_count += 1
+                conflicts_left = luby(restart_count) * self.RESTART_BASE
+                self._cancel_until(0)
+                if len(self.learnts) > self.LEARNT_LIMIT:
+                    self._reduce_db()
+                continue
+
+            lit = 0
+            while self._decision_level() < len(assumptions):
+                assumption = assumptions[self._decision_level()]
+                val = self._lit_value(assumption)
+                if val > 0:
+                    self.trail_lim.append(len(self.trail)) # Already true: dummy level
+                elif val < 0:
+                    return False # The clauses imply the assumption is false
+                else:
+                    lit = assumption
+                    break
+            if lit == 0:
+                lit = self._pick_branch_lit()
+            if lit == 0:
+                self.model = [var if self.assigns[var] > 0 else -var
+                              for var in range(1, self.num_vars + 1) if self.used[var]]
+                return True
+            if budget is not None:
+                try:
+                    budget.charge(1, self.propagations - charged)
+                except BudgetExhausted:
+                    self._cancel_until(0)
+                    raise
+                charged = self.propagations
+            self.decisions += 1
+            self.trail_lim.append(len(self.trail))
+            if len(self.trail_lim) > self.max_depth:
+                self.max_depth = len(self.trail_lim)
+            self._assign(lit, None)
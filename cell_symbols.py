@@ -0,0 +1,14 @@
+import re
+from functools import lru_cache
+from typing import Optional, Tuple
+
+Cell = Tuple[int, int]
+
+CELL_SYMBOL = re.compile(r"^[A-Z]+_(\d+)_(\d+)$") # P_x_y, W_x_y, B_x_y, S_x_y
+
+
+@lru_cache(maxsize=None)
+def symbol_cell(name: str) -> Optional[Cell]:
+    """The (x, y) cell a symbol such as "P_2_3" names, or None for other symbols."""
+    match = CELL_SYMBOL.match(name)
+    return (int(match.group(1)), int(match.group(2))) if match else None
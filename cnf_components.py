@@ -0,0 +1,76 @@
+from typing import Dict, Iterable, List, Optional, Set
+
+
+class ComponentIndex:
+    """
+    Union-find over variables that groups clauses into connected components:
+    two clauses are in the same component when they (transitively) share a variable.
+    Each component also caches whether its clauses alone are satisfiable, and a
+    model if they are, until a new clause touches it or one of its clauses is
+    dropped (drop_models).
+    """
+    def __init__(self):
+        self.parent: List[int] = [0] # parent[var]; index 0 is unused
+        self.size: List[int] = [0]
+        self.clauses: Dict[int, List[int]] = {} # root -> arena indices of its clauses
+        self.models: Dict[int, Optional[Set[int]]] = {} # root -> cached model, None if unsatisfiable
+        self.anchors: Dict[int, int] = {} # clause index -> one of its variables
+
+    def _ensure_var(self, var: int):
+        while len(self.parent) <= var:
+            self.parent.append(len(self.parent))
+            self.size.append(1)
+
+    def find(self, var: int) -> int:
+        self._ensure_var(var)
+        root = var
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[var] != root: # Path compression
+            self.parent[var], var = root, self.parent[var]
+        return root
+
+    def _union(self, a: int, b: int) -> int:
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return a
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        # Merge clause lists, the merged component has to be solved again
+        moved = self.clauses.pop(b, None)
+        if moved:
+            self.clauses.setdefault(a, []).extend(moved)
+        self.models.pop(a, None)
+        self.models.pop(b, None)
+        return a
+
+    def add_clause(self, index: int, clause: Iterable[int]):
+        """Register clause `index` of the arena and merge the components of its variables."""
+        root = 0
+        for lit in clause:
+            root = self._union(root, abs(lit)) if root else self.find(abs(lit))
+        if root:
+            self.clauses.setdefault(root, []).append(index)
+            self.models.pop(root, None)
+            self.anchors[index] = root
+
+    def drop_models(self, indices: Iterable[int]):
+        """Forget the cached models of the components of these clauses (removed or rewritten)."""
+        for index in indices:
+            var = self.anchors.pop(index, None)
+            if var is not None:
+                self.models.pop(self.find(var), None)
+
+    def roots_of(self, clause: Iterable[int]) -> Set[int]:
+        return set(self.find(abs(lit)) for lit in clause)
+
+    def roots(self) -> List[int]:
+        return list(self.clauses)
+
+    def clause_indices(self, roots: Iterable[int]) -> List[int]:
+        return [index for root in roots for index in self.clauses.get(root, ())]
+
+    def __len__(self) -> int:
+        return len(self.clauses)
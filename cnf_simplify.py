@@ -0,0 +1,258 @@
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+IntClause = Tuple[int, ...]
+
+
+class CNFSimplifier:
+    """
+    Working copy of the KB clauses that the solvers actually see, kept small by:
+
+    - root-level pruning: clauses satisfied by an implied unit are removed and
+      false literals are stripped
+    - forward subsumption (a new clause that contains an existing one is dropped)
+      and backward subsumption (existing clauses that contain a new one are removed)
+    - bounded variable elimination, for the variables `eliminable` accepts
+      (percept symbols), when it does not increase the number of clauses
+    - failed-literal probing: if propagating l alone leads to a conflict, ~l is a unit
+
+    Every change preserves satisfiability together with the units, and
+    extend_model() rebuilds values for eliminated variables, so a model of the
+    working clauses plus the units is a model of the original clauses.
+    Clauses get fresh ids; `added` logs new ids for the caller to index, and
+    `removed` the ids of clauses removed or replaced by a stripped copy.
+    """
+    ELIMINATION_LIMIT = 16 # Max clauses (pos * neg) a variable may have to be eliminated
+    PROBE_LIMIT = 200 # Literals probed per simplify() call
+
+    def __init__(self, eliminable: Callable[[int], bool] = lambda var: False, enabled: bool = True):
+        self.enabled = enabled
+        self.eliminable = eliminable
+        self.clauses: Dict[int, IntClause] = {}
+        self.occurs: Dict[int, Set[int]] = {} # literal -> ids of clauses containing it
+        self.units: Set[int] = set() # Root-level literals already applied
+        self.new_units: List[int] = [] # Units derived here (probing, elimination), for the caller
+        self.added: List[int] = [] # Ids of clauses added since the caller last cleared it
+        self.removed: List[int] = [] # Ids of clauses removed since the caller last cleared it
+        self.eliminated: List[Tuple[int, List[IntClause]]] = [] # (var, its removed clauses), in order
+        self.eliminated_vars: Set[int] = set()
+        self.frozen: Set[int] = set() # Variables that must stay (they appear in queries)
+        self.unsat = False
+        self._next_id = 0
+        self.stats: Dict[str, int] = {
+            "satisfied_removed": 0, "literals_stripped": 0, "subsumed_removed": 0,
+            "eliminated_vars": 0, "eliminated_clauses": 0, "resolvents_added": 0,
+            "restored_vars": 0, "failed_literals": 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self.clauses)
+
+    def num_vars(self) -> int:
+        return len(set(abs(lit) for lit in self.occurs if self.occurs[lit]))
+
+    # Adding and removing clauses
+
+    def add(self, clause: Iterable[int]) -> Optional[int]:
+        """Add a clause (simplified against the units). Returns its id, or None if it was not kept."""
+        if self.enabled:
+            clause = tuple(clause)
+            for lit in clause:
+                if abs(lit) in self.eliminated_vars:
+                    self._restore(abs(lit)) # The variable is constrained again
+            lits = []
+            for lit in clause:
+                if lit in self.units:
+                    self.stats["satisfied_removed"] += 1
+                    return None
+                if -lit in self.units:
+                    self.stats["literals_stripped"] += 1
+                else:
+                    lits.append(lit)
+            clause = tuple(sorted(set(lits)))
+            if any(-lit in clause for lit in clause):
+                self.stats["satisfied_removed"] += 1 # Tautology
+                return None
+            if not clause:
+                self.unsat = True
+                return None
+            if len(clause) == 1:
+                self._add_unit(clause[0])
+                return None
+            if self._subsumed(clause):
+                self.stats["subsumed_removed"] += 1
+                return None
+            self._backward_subsume(clause)
+        else:
+            clause = tuple(clause)
+
+        cid = self._next_id
+        self._next_id += 1
+        self.clauses[cid] = clause
+        for lit in clause:
+            self.occurs.setdefault(lit, set()).add(cid)
+        self.added.append(cid)
+        return cid
+
+    def _remove(self, cid: int):
+        for lit in self.clauses.pop(cid):
+            self.occurs[lit].discard(cid)
+        self.removed.append(cid)
+
+    def _subsumed(self, clause: IntClause) -> bool:
+        """Forward subsumption: is some existing clause a subset of `clause`?"""
+        lits = set(clause)
+        # A subset shares at least one literal with the clause, so it is on one of these lists
+        for lit in clause:
+            for cid in self.occurs.get(lit, ()):
+                if len(self.clauses[cid]) <= len(clause) and lits.issuperset(self.clauses[cid]):
+                    return True
+        return False
+
+    def _backward_subsume(self, clause: IntClause):
+        """Remove existing clauses that contain `clause`."""
+        rarest = min(clause, key=lambda l: len(self.occurs.get(l, ())))
+        for cid in list(self.occurs.get(rarest, ())):
+            other = self.clauses[cid]
+            if len(other) > len(clause) and set(other).issuperset(clause):
+                self._remove(cid)
+                self.stats["subsumed_removed"] += 1
+
+    # Root-level units
+
+    def _add_unit(self, lit: int):
+        if -lit in self.units:
+            self.unsat = True
+            return
+        if lit not in self.units:
+            self.new_units.append(lit)
+            self.apply_units([lit])
+
+    def apply_units(self, lits: Iterable[int]):
+        """Remove the clauses the units satisfy and strip the literals they falsify."""
+        if not self.enabled:
+            return
+        for lit in lits:
+            if lit in self.units:
+                continue
+            self.units.add(lit)
+            for cid in list(self.occurs.get(lit, ())):
+                if cid in self.clauses:
+                    self._remove(cid)
+                    self.stats["satisfied_removed"] += 1
+            for cid in list(self.occurs.get(-lit, ())):
+                if cid not in self.clauses:
+                    continue # Already removed while applying a unit derived below
+                clause = self.clauses[cid]
+                self._remove(cid)
+                self.stats["literals_stripped"] += 1
+                self.add(lit_ for lit_ in clause if lit_ != -lit)
+
+    # Periodic passes
+
+    def simplify(self):
+        if not self.enabled or self.unsat:
+            return
+        self._eliminate_variables()
+        self._probe_failed_literals()
+
+    def _eliminate_variables(self):
+        candidates = set(abs(lit) for lit, ids in self.occurs.items() if ids)
+        for var in sorted(candidates):
+            if var in self.frozen or var in self.eliminated_vars or not self.eliminable(var):
+                continue
+            pos = [self.clauses[cid] for cid in self.occurs.get(var, ())]
+            neg = [self.clauses[cid] for cid in self.occurs.get(-var, ())]
+            if len(pos) * len(neg) > self.ELIMINATION_LIMIT:
+                continue
+            resolvents = []
+            for p in pos:
+                for n in neg:
+                    resolvent = set(p) | set(n)
+                    resolvent.discard(var)
+                    resolvent.discard(-var)
+                    if not any(-lit in resolvent for lit in resolvent): # Skip tautologies
+                        resolvents.append(tuple(sorted(resolvent)))
+            if len(resolvents) > len(pos) + len(neg):
+                continue
+            for cid in list(self.occurs.get(var, ())) + list(self.occurs.get(-var, ())):
+                self._remove(cid)
+            self.eliminated.append((var, pos + neg))
+            self.eliminated_vars.add(var)
+            self.stats["eliminated_vars"] += 1
+            self.stats["eliminated_clauses"] += len(pos) + len(neg)
+            for resolvent in resolvents:
+                self.stats["resolvents_added"] += 1
+                self.add(resolvent)
+                if self.unsat:
+                    return
+
+    def _probe_failed_literals(self):
+        """Probe the literals of long clauses: if l propagates to a conflict, ~l holds."""
+        candidates = []
+        for clause in self.clauses.values():
+            if len(clause) > 2:
+                candidates.extend(clause)
+        probed = 0
+        for lit in dict.fromkeys(candidates):
+            if probed >= self.PROBE_LIMIT or self.unsat:
+                break
+            if lit in self.units or -lit in self.units:
+                continue
+            probed += 1
+            if not self._propagates_consistently(lit):
+                self.stats["failed_literals"] += 1
+                self._add_unit(-lit)
+
+    def _propagates_consistently(self, lit: int) -> bool:
+        assigned = {lit}
+        queue = [lit]
+        while queue:
+            false_lit = -queue.pop()
+            for cid in self.occurs.get(false_lit, ()):
+                unassigned = []
+                for other in self.clauses[cid]:
+                    if other in assigned:
+                        break
+                    if -other not in assigned:
+                        unassigned.append(other)
+                else:
+                    if not unassigned:
+                        return False
+                    if len(unassigned) == 1:
+                        assigned.add(unassigned[0])
+                        queue.append(unassigned[0])
+        return True
+
+    # Queries over eliminated variables
+
+    def freeze(self, var: int):
+        """Keep `var` in the working clauses, restoring it if it was eliminated."""
+        self.frozen.add(var)
+        if var in self.eliminated_vars:
+            self._restore(var)
+
+    def _restore(self, var: int):
+        """Undo the elimination of `var` by adding its removed clauses back."""
+        for i, (eliminated_var, saved) in enumerate(self.eliminated):
+            if eliminated_var == var:
+                del self.eliminated[i]
+                break
+        self.eliminated_vars.discard(var)
+        self.stats["restored_vars"] += 1
+        for clause in saved:
+            self.add(clause)
+
+    def extend_model(self, model: Set[int]) -> Set[int]:
+        """Give eliminated variables values that satisfy their removed clauses (in place)."""
+        for var, saved in reversed(self.eliminated):
+            if var in model or -var in model:
+                continue
+            needs_true = any(var in clause and not any(lit in model for lit in clause if lit != var)
+                             for clause in saved)
+            model.add(var if needs_true else -var)
+            for clause in saved:
+                if not any(lit in model for lit in clause):
+                    free = next((lit for lit in clause if -lit not in model), None)
+                    if free is not None:
+                        model.add(free)
+        return model
@@ -0,0 +1,89 @@
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+IntClause = Tuple[int, ...]
+
+
+def to_dimacs(clauses: Iterable[Sequence[int]], num_vars: int, comments: Iterable[str] = ()) -> str:
+    """Format int-encoded clauses as DIMACS CNF text."""
+    clauses = list(clauses)
+    lines = [f"c {comment}" for comment in comments]
+    lines.append(f"p cnf {num_vars} {len(clauses)}")
+    for clause in clauses:
+        lines.append(" ".join(str(lit) for lit in clause) + " 0")
+    return "\n".join(lines) + "\n"
+
+
+def parse_dimacs(text: str) -> Tuple[int, List[IntClause]]:
+    """Parse DIMACS CNF text. Returns (number of variables, clauses)."""
+    num_vars = 0
+    clauses: List[IntClause] = []
+    current: List[int] = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("c") or line.startswith("%"):
+            continue
+        if line.startswith("p"):
+            fields = line.split()
+            if len(fields) != 4 or fields[1] != "cnf":
+                raise ValueError(f"Bad DIMACS header: {line!r}")
+            num_vars = int(fields[2])
+            continue
+        for token in line.split():
+            lit = int(token)
+            if lit == 0:
+                clauses.append(tuple(current))
+                current = []
+            else:
+                current.append(lit)
+    if current:
+        clauses.append(tuple(current)) # Last clause without its terminating 0
+    return num_vars, clauses
+
+
+def read_dimacs(path: str) -> Tuple[int, List[IntClause]]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_dimacs(f.read())
+
+
+def read_symbol_map(cnf_path: str) -> Dict:
+    """Load the sidecar written next to a recorded problem (symbol names, query, verdict)."""
+    with open(sidecar_path(cnf_path), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def sidecar_path(cnf_path: str) -> str:
+    return os.path.splitext(cnf_path)[0] + ".json"
+
+
+class ProblemRecorder:
+    """
+    Writes every entailment problem a KnowledgeBase decides (KB AND ~query) to
+    `directory` as problem_NNNNN.cnf, with a problem_NNNNN.json sidecar holding
+    the symbol map, the query and the verdict. One recorder can be shared by
+    the successive KBs of an episode.
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.count = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def record(self, clauses: Iterable[Sequence[int]], negated_query_clause: Sequence[int],
+               symbol_names: List[str], query: List[Tuple[str, bool]], entailed: Optional[bool]) -> str:
+        """Write one problem; symbol_names[i - 1] is the name of variable i. Returns the .cnf path."""
+        self.count += 1
+        path = os.path.join(self.directory, f"problem_{self.count:05d}.cnf")
+        problem = list(clauses) + [tuple(negated_query_clause)]
+        expected = {True: "UNSAT", False: "SAT", None: "UNKNOWN"}[entailed]
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(to_dimacs(problem, len(symbol_names),
+                              [f"KB AND ~query, query {query}", f"expected {expected}"]))
+        with open(sidecar_path(path), 'w', encoding='utf-8') as f:
+            json.dump({
+                "symbols": {str(i + 1): name for i, name in enumerate(symbol_names)},
+                "query": [[sym, value] for sym, value in query],
+                "entailed": entailed,
+                "expected": expected,
+            }, f, indent=1)
+        return path
@@ -0,0 +1,256 @@
+from typing import Dict, List, Optional, Sequence
+
+from search_budget import SearchBudget
+
+
+class BranchingHeuristic:
+    """Chooses the next decision literal for IterativeDPLL."""
+    name = "first"
+
+    def pick(self, solver: "IterativeDPLL") -> int:
+        """Return the literal to assign next, or 0 if every variable is assigned."""
+        for var in solver.vars:
+            if solver.value[var] == 0:
+                return var
+        return 0
+
+    def on_conflict(self, solver: "IterativeDPLL", clause: List[int]):
+        pass
+
+
+class ClauseScoreHeuristic(BranchingHeuristic):
+    """
+    Base for heuristics that score literals over the clauses that are not yet
+    satisfied, found through the occurrence lists of the unassigned literals.
+    """
+    def score(self, counts: Dict[int, float], lit: int, length: int, min_length: int) -> None:
+        raise NotImplementedError
+
+    def pick(self, solver: "IterativeDPLL") -> int:
+        lengths: Dict[int, int] = {} # Unassigned literals of each open clause
+        for var in solver.vars:
+            if solver.value[var] != 0:
+                continue
+            for lit in (var, -var):
+                for ci in solver.occurs.get(lit, ()):
+                    if ci not in lengths:
+                        lengths[ci] = solver.open_length(ci)
+        open_clauses = [ci for ci, length in lengths.items() if length > 0]
+        if not open_clauses:
+            return BranchingHeuristic.pick(self, solver)
+        min_length = min(lengths[ci] for ci in open_clauses)
+        counts: Dict[int, float] = {}
+        for ci in open_clauses:
+            for lit in solver.clauses[ci]:
+                if solver.value[abs(lit)] == 0:
+                    self.score(counts, lit, lengths[ci], min_length)
+        if not counts:
+            return BranchingHeuristic.pick(self, solver)
+        return self.best(counts)
+
+    def best(self, counts: Dict[int, float]) -> int:
+        return max(counts, key=counts.get)
+
+
+class DLISHeuristic(ClauseScoreHeuristic):
+    """Dynamic Largest Individual Sum: the literal in the most open clauses."""
+    name = "dlis"
+
+    def score(self, counts, lit, length, min_length):
+        counts[lit] = counts.get(lit, 0) + 1
+
+
+class JeroslowWangHeuristic(ClauseScoreHeuristic):
+    """Jeroslow-Wang: sum of 2^-|c| over the open clauses containing the literal."""
+    name = "jw"
+
+    def score(self, counts, lit, length, min_length):
+        counts[lit] = counts.get(lit, 0.0) + 2.0 ** -length
+
+
+class MOMsHeuristic(ClauseScoreHeuristic):
+    """Maximum Occurrences in clauses of Minimum Size, combined over both polarities."""
+    name = "moms"
+    K = 2
+
+    def score(self, counts, lit, length, min_length):
+        if length == min_length:
+            counts[lit] = counts.get(lit, 0) + 1
+
+    def best(self, counts):
+        def combined(var):
+            pos, neg = counts.get(var, 0), counts.get(-var, 0)
+            return (pos + neg) * 2 ** self.K + pos * neg
+        var = max(set(abs(lit) for lit in counts), key=combined)
+        return var if counts.get(var, 0) >= counts.get(-var, 0) else -var
+
+
+class VSIDSHeuristic(BranchingHeuristic):
+    """Literal activity bumped for the literals of each conflicting clause, with decay."""
+    name = "vsids"
+    DECAY = 0.95
+
+    def __init__(self):
+        self.activity: Dict[int, float] = {}
+        self.inc = 1.0
+
+    def pick(self, solver):
+        best_lit, best_score = 0, -1.0
+        for var in solver.vars:
+            if solver.value[var] != 0:
+                continue
+            for lit in (var, -var):
+                score = self.activity.get(lit, 0.0)
+                if score > best_score:
+                    best_lit, best_score = lit, score
+        return best_lit
+
+    def on_conflict(self, solver, clause):
+        for lit in clause:
+            self.activity[lit] = self.activity.get(lit, 0.0) + self.inc
+        self.inc /= self.DECAY
+        if self.inc > 1e100:
+            self.activity = {lit: score * 1e-100 for lit, score in self.activity.items()}
+            self.inc *= 1e-100
+
+
+HEURISTICS = {
+    heuristic.name: heuristic
+    for heuristic in (BranchingHeuristic, DLISHeuristic, JeroslowWangHeuristic, MOMsHeuristic, VSIDSHeuristic)
+}
+
+
+class IterativeDPLL:
+    """
+    Iterative DPLL over int-encoded clauses (+var / -var literals).
+    Assignments live on a trail split into decision levels, so backtracking
+    only undoes the literals assigned since the last decision instead of
+    copying the model and the clause set on every step.
+    The decision literal comes from a BranchingHeuristic (see HEURISTICS).
+    """
+    def __init__(self, clauses: Sequence[Sequence[int]], heuristic: str = "first"):
+        if heuristic not in HEURISTICS:
+            raise ValueError(f"Unknown heuristic {heuristic!r}, expected one of {tuple(HEURISTICS)}")
+        self.heuristic = HEURISTICS[heuristic]()
+        self.clauses: List[List[int]] = [list(clause) for clause in clauses]
+        self.vars: List[int] = sorted(set(abs(lit) for clause in self.clauses for lit in clause))
+        self.num_vars = self.vars[-1] if self.vars else 0
+
+        # Occurrence lists: literal -> indices of clauses containing it
+        self.occurs: Dict[int, List[int]] = {}
+        for i, clause in enumerate(self.clauses):
+            for lit in clause:
+                self.occurs.setdefault(lit, []).append(i)
+
+        self.value: List[int] = [0] * (self.num_vars + 1) # 1 true, -1 false, 0 unassigned
+        self.trail: List[int] = [] # Assigned literals in assignment order
+        self.trail_lim: List[int] = [] # trail index where each decision level starts
+        self.flipped: List[bool] = [] # Whether the decision of each level was already flipped
+        self.qhead = 0 # Next trail position to propagate
+
+        self.decisions = 0
+        self.propagations = 0
+        self.conflicts = 0
+        self.clauses_scanned = 0
+        self.max_depth = 0 # Deepest decision level reached
+
+    def _lit_value(self, lit: int) -> int:
+        val = self.value[abs(lit)]
+        return val if lit > 0 else -val
+
+    def _assign(self, lit: int):
+        self.value[abs(lit)] = 1 if lit > 0 else -1
+        self.trail.append(lit)
+
+    def _propagate(self) -> bool:
+        """Unit propagation from qhead. Returns False on conflict."""
+        value = self.value
+        while self.qhead < len(self.trail):
+            false_lit = -self.trail[self.qhead]
+            self.qhead += 1
+            occurrences = self.occurs.get(false_lit, ())
+            self.clauses_scanned += len(occurrences)
+            for ci in occurrences:
+                unassigned = 0
+                last = 0
+                for lit in self.clauses[ci]:
+                    val = value[abs(lit)]
+                    if val == 0:
+                        unassigned += 1
+                        last = lit
+                    elif (val > 0) == (lit > 0):
+                        break # Clause already true
+                else:
+                    if unassigned == 0:
+                        self.conflicts += 1
+                        self.heuristic.on_conflict(self, self.clauses[ci])
+                        return False
+                    if unassigned == 1:
+                        self.propagations += 1
+                        self._assign(last)
+        return True
+
+    def _backtrack(self) -> bool:
+        """Undo to the latest unflipped decision and flip it. Returns False if none is left."""
+        while self.trail_lim:
+            start = self.trail_lim.pop()
+            decision = self.trail[start]
+            was_flipped = self.flipped.pop()
+            for lit in self.trail[start:]:
+                self.value[abs(lit)] = 0
+            del self.trail[start:]
+            self.qhead = start
+            if not was_flipped:
+                self.trail_lim.append(len(self.trail))
+                self.flipped.append(True)
+                self._assign(-decision)
+                return True
+        return False
+
+    def open_length(self, ci: int) -> int:
+        """Number of unassigned literals of clause ci, or 0 if it is already satisfied."""
+        length = 0
+        for lit in self.clauses[ci]:
+            val = self.value[abs(lit)]
+            if val == 0:
+                length += 1
+            elif (val > 0) == (lit > 0):
+                return 0
+        return length
+
+    def solve(self, budget: Optional[SearchBudget] = None) -> Optional[List[int]]:
+        """
+        Return the true literals of a satisfying model, or None if unsatisfiable.
+        Raises BudgetExhausted if the budget runs out first.
+        """
+        for clause in self.clauses:
+            if not clause:
+                return None
+            if len(clause) == 1:
+                val = self._lit_value(clause[0])
+                if val < 0:
+                    return None
+                if val == 0:
+                    self._assign(clause[0])
+
+        charged = 0 # Propagations already charged to the budget
+        while True:
+            if not self._propagate():
+                if not self._backtrack():
+                    return None
+                continue
+
+            lit = self.heuristic.pick(self)
+            if lit == 0:
+                return list(self.trail)
+
+            # Branching: try the chosen literal first, its negation on backtrack
+            if budget is not None:
+                budget.charge(1, self.propagations - charged)
+                charged = self.propagations
+            self.decisions += 1
+            self.trail_lim.append(len(self.trail))
+            self.flipped.append(False)
+            if len(self.trail_lim) > self.max_depth:
+                self.max_depth = len(self.trail_lim)
+            self._assign(lit)
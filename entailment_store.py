@@ -0,0 +1,95 @@
+import hashlib
+import os
+import sqlite3
+import time
+from typing import Iterable, Optional, Tuple
+
+DIGEST_MOD = 1 << 128
+
+
+def literal_set_hash(literals: Iterable[Tuple[str, bool]]) -> int:
+    """Hash of a clause (or query) by symbol names, independent of literal order and interning."""
+    text = "|".join(sorted(f"{sym}:{int(value)}" for sym, value in literals))
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest(), "big")
+
+
+class PersistentEntailmentCache:
+    """
+    On-disk map from (clause set, query) to the entailment verdict, shared across
+    processes and runs. Keys are hex digests: a KnowledgeBase combines the hashes
+    of its clauses into an order-independent digest (sum mod 2^128) as clauses are
+    told, so the key of a state is the same in every run that reaches it.
+
+    SQLite in WAL mode lets any number of processes read while one writes; a
+    connection is opened per process (after a fork the child opens its own).
+    Writes that find the database locked are skipped, since the cache is only
+    an accelerator. Once the table holds more than max_entries rows, the oldest
+    EVICT_FRACTION of them are deleted.
+    """
+    EVICT_FRACTION = 0.1
+
+    def __init__(self, path: str = "results/entailment_cache.sqlite", max_entries: int = 200000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._inserts = 0 # Since the last size check
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            self._pid = os.getpid()
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS entailment ("
+                               "key TEXT PRIMARY KEY, entailed INTEGER NOT NULL, created REAL NOT NULL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS entailment_created ON entailment(created)")
+        return self._conn
+
+    @staticmethod
+    def key(kb_digest: int, query_hash: int) -> str:
+        return f"{kb_digest:032x}{query_hash:032x}"
+
+    def get(self, key: str) -> Optional[bool]:
+        try:
+            row = self._connection().execute("SELECT entailed FROM entailment WHERE key = ?", (key,)).fetchone()
+        except sqlite3.OperationalError:
+            row = None # Locked or unavailable: behave like a miss
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return bool(row[0])
+
+    def put(self, key: str, entailed: bool):
+        try:
+            conn = self._connection()
+            conn.execute("INSERT OR REPLACE INTO entailment (key, entailed, created) VALUES (?, ?, ?)",
+                         (key, int(entailed), time.time()))
+            self._inserts += 1
+            if self._inserts >= max(1, int(self.max_entries * self.EVICT_FRACTION)):
+                self._inserts = 0
+                self._evict(conn)
+        except sqlite3.OperationalError:
+            pass
+
+    def _evict(self, conn: sqlite3.Connection):
+        (count,) = conn.execute("SELECT COUNT(*) FROM entailment").fetchone()
+        if count > self.max_entries:
+            excess = count - self.max_entries + int(self.max_entries * self.EVICT_FRACTION)
+            conn.execute("DELETE FROM entailment WHERE key IN "
+                         "(SELECT key FROM entailment ORDER BY created LIMIT ?)", (excess,))
+
+    def __len__(self) -> int:
+        (count,) = self._connection().execute("SELECT COUNT(*) FROM entailment").fetchone()
+        return count
+
+    def close(self):
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
@@ -0,0 +1,248 @@
+import argparse
+import json
+import random
+import statistics
+import time
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+
+from agent_knowledge import MapKnowledge
+from dpll_solver import HEURISTICS
+from inference import KnowledgeBase, IntClause, SAT_ENGINES, iterative_engine, register_engine
+from inference_engine import InferenceEngine
+
+Problem = List[IntClause]
+
+
+def random_cnf(rng: random.Random, num_vars: int, num_clauses: int, max_len: int = 3) -> Problem:
+    """Uniform random CNF; clause lengths 1..max_len, so small ones are often unsatisfiable."""
+    clauses = []
+    for _ in range(num_clauses):
+        length = rng.randint(1, max_len)
+        clauses.append(tuple(sorted(set(rng.choice((1, -1)) * rng.randint(1, num_vars) for _ in range(length)))))
+    return clauses
+
+
+def wumpus_kb(rng: random.Random, size: int, pit_prob: float = 0.2, noise: float = 0.0) -> Tuple[KnowledgeBase, List[Tuple[int, int]]]:
+    """
+    Build the KB of an agent that explored part of a random world, through
+    InferenceEngine._add_biconditional. With noise > 0 percepts are flipped at random,
+    which can make the KB inconsistent. Returns the KB and the unvisited cells.
+    """
+    pits = set((x, y) for x in range(size) for y in range(size) if (x, y) != (0, 0) and rng.random() < pit_prob)
+    wumpus = rng.choice([(x, y) for x in range(size) for y in range(size) if (x, y) != (0, 0)])
+    knowledge = MapKnowledge(size, 1)
+    engine = InferenceEngine(knowledge)
+    kb = KnowledgeBase()
+
+    # Visit a random connected region of safe cells, starting from (0, 0)
+    visited = {(0, 0)}
+    frontier = deque([(0, 0)])
+    target = rng.randint(1, size * size // 2)
+    while frontier and len(visited) < target:
+        x, y = frontier.popleft()
+        for cell in knowledge.get_neighbors(x, y):
+            if cell not in visited and cell not in pits and cell != wumpus and rng.random() < 0.7:
+                visited.add(cell)
+                frontier.append(cell)
+
+    for (x, y) in visited:
+        breeze = any(cell in pits for cell in knowledge.get_neighbors(x, y))
+        stench = wumpus in knowledge.get_neighbors(x, y)
+        if rng.random() < noise:
+            breeze = not breeze
+        if rng.random() < noise:
+            stench = not stench
+        kb.tell(frozenset([(f"P_{x}_{y}", False)]))
+        kb.tell(frozenset([(f"W_{x}_{y}", False)]))
+        engine._add_biconditional(kb, "B", x, y, "P", breeze)
+        engine._add_biconditional(kb, "S", x, y, "W", stench)
+    unvisited = [(x, y) for x in range(size) for y in range(size) if (x, y) not in visited]
+    return kb, unvisited
+
+
+def satisfies(model: Set[int], clauses: Problem) -> bool:
+    return all(any(lit in model for lit in clause) for clause in clauses)
+
+
+def check(engines: List[str], clauses: Problem, timings: Dict[str, List[float]]) -> Optional[str]:
+    """Solve with every engine. Returns a description of the first disagreement, or None."""
+    verdicts = {}
+    for name in engines:
+        start = time.perf_counter()
+        model = SAT_ENGINES[name](list(clauses))
+        timings[name].append(time.perf_counter() - start)
+        if model is not None and not satisfies(model, clauses):
+            return f"{name} returned a model that falsifies a clause"
+        verdicts[name] = model is not None
+    if len(set(verdicts.values())) > 1:
+        return "SAT/UNSAT verdicts differ: " + ", ".join(f"{n}={'SAT' if v else 'UNSAT'}" for n, v in verdicts.items())
+    return None
+
+
+def shrink(engines: List[str], clauses: Problem) -> Problem:
+    """Delta-debug a disagreement: drop clauses, then literals, while the engines still disagree."""
+    scratch: Dict[str, List[float]] = {name: [] for name in engines}
+    clauses = list(clauses)
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(clauses) - 1, -1, -1):
+            candidate = clauses[:i] + clauses[i + 1:]
+            if check(engines, candidate, scratch):
+                clauses = candidate
+                changed = True
+        for i in range(len(clauses)):
+            for lit in clauses[i]:
+                candidate = clauses[:i] + [tuple(l for l in clauses[i] if l != lit)] + clauses[i + 1:]
+                if check(engines, candidate, scratch):
+                    clauses = candidate
+                    changed = True
+                    break
+    return clauses
+
+
+def check_entailment(solvers: List[str], rng: random.Random, size: int, noise: float) -> Optional[str]:
+    """Ask the same P/W queries to one KB per solver and compare with the reference engine."""
+    kb_seed = rng.random()
+    kbs = {}
+    for solver in ["reference"] + solvers:
+        kbs[solver], unvisited = wumpus_kb(random.Random(kb_seed), size, noise=noise)
+    queries = [(f"{prefix}_{x}_{y}", value) for x, y in unvisited for prefix in ("P", "W") for value in (True, False)]
+    expected = set(q for q in queries if kbs["reference"].ask(frozenset([q])))
+    for solver in solvers:
+        got = kbs[solver].ask_many(queries)
+        if got != expected:
+            return f"{solver}: ask_many differs from reference on {sorted(got ^ expected)}"
+        for q in queries[:8]:
+            if kbs[solver].ask(frozenset([q])) != (q in expected):
+                return f"{solver}: ask{q} differs from reference"
+    return None
+
+
+Script = List[Tuple[str, List[Tuple[str, bool]]]] # ("tell" | "ask" | "ask_many", literals)
+
+_AB_UNSAT = [("tell", [("a", True), ("b", True)]), ("tell", [("a", True), ("b", False)]),
+             ("tell", [("a", False), ("b", True)]), ("tell", [("a", False), ("b", False)])]
+
+# Tell/ask sequences that once went wrong, replayed before the random rounds.
+# A new unit satisfied or shrank a clause of a component whose model was cached,
+# and the stale model (holding x and ~x once merged with the units) refuted queries.
+REGRESSION_SCRIPTS: List[Script] = [
+    [("tell", [("u", sign), ("v", True)]), ("tell", [("p", True), ("q", True)]),
+     ("tell", [("w", True), ("s", True)]), ("tell", [("w", True), ("s", False)]),
+     ("ask", [("p", True)]), ("tell", [("u", not sign)]), ("ask", [("q", True)]),
+     ("ask_many", [("v", True), ("w", True)]), ("ask", [("v", True), ("w", True)])]
+    + _AB_UNSAT + [("ask", [("q", True)])]
+    for sign in (False, True)
+]
+
+
+def random_script(rng: random.Random, num_vars: int, length: int) -> Script:
+    """Interleaved tells and asks over random clauses, to exercise the KB's incremental state."""
+    def literals(max_len: int) -> List[Tuple[str, bool]]:
+        return [(f"x{rng.randint(1, num_vars)}", rng.random() < 0.5) for _ in range(rng.randint(1, max_len))]
+    script = []
+    for _ in range(length):
+        op = rng.choice(("tell", "tell", "ask", "ask_many"))
+        script.append((op, literals(4 if op == "ask_many" else 3)))
+    return script
+
+
+def check_script(solvers: List[str], script: Script) -> Optional[str]:
+    """
+    Replay a script on one KB per solver and compare every answer with a fresh
+    reference KB told the same clauses: the reference engine shares the KB's
+    caches and models, so only a KB without history is a ground truth for them.
+    """
+    kbs = {solver: KnowledgeBase(solver) for solver in solvers}
+    told = []
+    for step, (op, lits) in enumerate(script):
+        if op == "tell":
+            told.append(frozenset(lits))
+            for kb in kbs.values():
+                kb.tell(frozenset(lits))
+            continue
+        reference = KnowledgeBase("reference")
+        for clause in told:
+            reference.tell(clause)
+        expected = reference.ask(frozenset(lits)) if op == "ask" else reference.ask_many(lits)
+        for solver, kb in kbs.items():
+            got = kb.ask(frozenset(lits)) if op == "ask" else kb.ask_many(lits)
+            if got != expected:
+                return f"{solver}: step {step} {op}{lits} differs from reference"
+    return None
+
+
+def summarize(times: List[float]) -> Dict[str, float]:
+    times = sorted(times)
+    return {
+        "count": len(times),
+        "mean_ms": round(statistics.mean(times) * 1000, 4) if times else 0.0,
+        "median_ms": round(statistics.median(times) * 1000, 4) if times else 0.0,
+        "p95_ms": round(times[int(0.95 * (len(times) - 1))] * 1000, 4) if times else 0.0,
+        "max_ms": round(times[-1] * 1000, 4) if times else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Differential fuzzing of the SAT engines in inference.SAT_ENGINES.")
+    parser.add_argument("--rounds", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engines", nargs="*", default=None, help="engines to compare (default: all registered)")
+    parser.add_argument("--output", default=None, help="optional JSON file for the timings and failures")
+    args = parser.parse_args()
+
+    # The branching heuristics of the iterative engine are fuzzed as engines of their own
+    for heuristic in HEURISTICS:
+        if heuristic != "first":
+            register_engine(f"iterative-{heuristic}",
+                            lambda clauses, stats=None, budget=None, h=heuristic, **options:
+                            iterative_engine(clauses, stats, budget, heuristic=h))
+    engines = args.engines or list(SAT_ENGINES)
+    rng = random.Random(args.seed)
+    timings: Dict[str, List[float]] = {name: [] for name in engines}
+    failures = []
+    solvers = [name for name in engines if name in KnowledgeBase.SOLVERS]
+
+    for script in REGRESSION_SCRIPTS:
+        error = check_script(solvers, script)
+        if error:
+            failures.append({"round": None, "kind": "regression", "error": error})
+            print(f"regression: {error}")
+
+    for i in range(args.rounds):
+        kind = ("random", "wumpus", "entailment", "incremental")[i % 4]
+        if kind == "random":
+            problem = random_cnf(rng, rng.randint(3, 12), rng.randint(3, 40))
+        elif kind == "wumpus":
+            kb, unvisited = wumpus_kb(rng, rng.randint(3, 6), noise=rng.choice((0.0, 0.1)))
+            problem = list(kb.arena)
+            if unvisited:
+                x, y = rng.choice(unvisited)
+                problem.append((-kb.symbols.intern(f"{rng.choice('PW')}_{x}_{y}"),)) # KB AND ~query
+        else:
+            if kind == "entailment":
+                error = check_entailment(solvers, rng, rng.randint(3, 5), rng.choice((0.0, 0.1)))
+            else:
+                error = check_script(solvers, random_script(rng, rng.randint(3, 8), rng.randint(4, 16)))
+            if error:
+                failures.append({"round": i, "kind": kind, "error": error})
+                print(f"round {i}: {error}")
+            continue
+
+        error = check(engines, problem, timings)
+        if error:
+            minimal = shrink(engines, problem)
+            failures.append({"round": i, "kind": kind, "error": error, "cnf": minimal})
+            print(f"round {i}: {error}\n  minimal CNF: {minimal}")
+
+    print(f"{args.rounds} rounds, {len(failures)} disagreements")
+    summary = {name: summarize(times) for name, times in timings.items()}
+    for name, row in summary.items():
+        print(f"{name:>16}: mean {row['mean_ms']:8.3f} ms  median {row['median_ms']:8.3f} ms  "
+              f"p95 {row['p95_ms']:8.3f} ms  max {row['max_ms']:8.3f} ms")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"timings": summary, "failures": failures}, f, indent=4)
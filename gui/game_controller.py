@@ -3,6 +3,7 @@ import time
 from environment import Environment, Action
 from hybrid_agent import HybridAgent
 from random_agent import RandomAgent
+from search_budget import SearchBudget
 from gui.board import Board
 from gui.info_panel import InfoPanel
 import random
@@ -11,6 +12,7 @@ from gui.menu import MainMenu
 
 class GameController:
     """Game state controller for pause/resume functionality"""
+    INFERENCE_BUDGET_S = 0.5  # Search time ceiling per agent step, keeps the GUI responsive
 
     def __init__(self, screen_width: int, screen_height: int):
         self.screen_width = screen_width
@@ -169,7 +171,7 @@ class GameController:
         if agent_mode == MainMenu.AgentMode.RANDOM:
             return RandomAgent(env)
         else:
-            return HybridAgent(env)
+            return HybridAgent(env, budget=SearchBudget(max_time_s=self.INFERENCE_BUDGET_S))
 
     def setup_game_components(self, settings):
         """Initialize all game components and return them"""
@@ -2,15 +2,31 @@ from environment import Environment, Action, Percept, AgentState, Direction
 from agent_knowledge import MapKnowledge, CellStatus
 from inference_engine import InferenceEngine
 from planning import Planner
-from typing import List, Optional
+from search_budget import SearchBudget
+from dimacs import ProblemRecorder
+from entailment_store import PersistentEntailmentCache
+from parallel_ask import ParallelAsker
+from typing import Dict, List, Optional
 import time
 
 class HybridAgent:
-    def __init__(self, environment: Environment):
+    RISK_MODES = ("heuristic", "exact") # Neighbour percept count, or model counting (see cell_probabilities)
+
+    def __init__(self, environment: Environment, solver: str = "iterative", instrument: bool = False,
+                 budget: Optional[SearchBudget] = None, recorder: Optional[ProblemRecorder] = None,
+                 persistent_cache: Optional[PersistentEntailmentCache] = None,
+                 executor: Optional[ParallelAsker] = None, risk: str = "heuristic",
+                 eliminate_percepts: bool = True, slice_radius: Optional[int] = None, memoize: bool = True):
+        if risk not in self.RISK_MODES:
+            raise ValueError(f"Unknown risk {risk!r}, expected one of {self.RISK_MODES}")
         self.environment = environment
         self.knowledge = MapKnowledge(environment.size, environment.num_wumpus)
-        self.inference_engine = InferenceEngine(self.knowledge)
+        self.inference_engine = InferenceEngine(self.knowledge, solver=solver, instrument=instrument, budget=budget,
+                                                recorder=recorder, persistent_cache=persistent_cache,
+                                                executor=executor, eliminate_percepts=eliminate_percepts,
+                                                slice_radius=slice_radius, memoize=memoize)
         self.planner = Planner(environment.size, self.knowledge)
+        self.risk = risk # One of RISK_MODES
         self.state = AgentState()
         self.action_plan: List[Action] = []
         # Ensure KB is reset immediately after any wumpus movement
@@ -48,6 +64,15 @@ class HybridAgent:
         
         print(f"\nGame Over. Final Score: {self.environment.agent_state.score}, {self.environment.agent_action_count} actions taken, {self.environment.agent_state.has_gold} gold collected, {self.environment.agent_state.alive} alive")
 
+    def solver_stats(self) -> Dict[str, float]:
+        """Search counters of the episode (needs instrument=True), the slowest inference step and the asks the memo skipped."""
+        engine = self.inference_engine
+        stats = engine.episode_stats.as_dict()
+        stats["inferences"] = len(engine.inference_stats)
+        stats["max_inference_time_s"] = max((s.time_s for s in engine.inference_stats), default=0.0)
+        stats["skipped_asks"] = engine.skipped_asks
+        return stats
+
     def think(self, percepts: Percept):
         self.knowledge.update_after_visit(self.state.x, self.state.y, percepts)
 
@@ -59,6 +84,14 @@ class HybridAgent:
         )
         inference_end_time = time.time()
 
+        if self.risk == "exact":
+            # Unvisited unknown cells only: visited ones went back to UNKNOWN after a wumpus reset
+            frontier = [pos for pos, cell in self.knowledge.grid.items()
+                        if cell.status == CellStatus.UNKNOWN and not cell.visited]
+            probabilities = self.inference_engine.cell_probabilities(
+                frontier, self.environment.pit_prob, self.environment.num_wumpus)
+            self.planner.risk_probabilities = {pos: p[2] for pos, p in probabilities.items()} or None
+
         if percepts.glitter:
             self.action_plan = [Action.GRAB]
             self.state.has_gold = True
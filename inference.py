@@ -1,10 +1,30 @@
-from typing import Set, Tuple, List, FrozenSet, Optional, Dict, Union
+import json
+from array import array
+from collections import OrderedDict
+from typing import Set, Tuple, List, FrozenSet, Optional, Dict, Union, Iterable, Iterator, Sequence, Callable, TYPE_CHECKING
+from dpll_solver import HEURISTICS, IterativeDPLL
+from cdcl_solver import CDCLSolver
+from cnf_components import ComponentIndex
+from cnf_simplify import CNFSimplifier
+from unit_propagation import UnitClosure
+from two_sat import is_two_sat, two_sat_model
+from solver_stats import SolverStats
+from search_budget import BudgetExhausted, SearchBudget
+from dimacs import ProblemRecorder, to_dimacs, sidecar_path
+from entailment_store import DIGEST_MOD, PersistentEntailmentCache, literal_set_hash
+
+if TYPE_CHECKING:
+    from parallel_ask import ParallelAsker # Imports this module
+    from relevance_slice import CellClauseIndex # Imports this module
 
 Literal = Tuple[str, bool] # (symbol, truth-value)
 Clause = FrozenSet[Literal] # Disjunction of literals
 Clauses = Set[Clause] # Set of clauses (CNF)
 Model = Dict[str, bool] # Model (assignment of symbols to truth values)
 
+IntLiteral = int # +var if true, -var if false (var >= 1)
+IntClause = Tuple[int, ...] # Sorted tuple of distinct int literals
+
 def negate_literal(lit: Literal) -> Literal:
     """Negates a literal."""
     sym, val = lit
@@ -96,30 +116,843 @@ def dpll(clauses: Clauses, symbols: List[str], model: Model) -> Union[Model, boo
     return dpll(clauses, remaining_symbols, model_false)
 
 
-class KnowledgeBase:
+def iterative_dpll_satisfiable(clauses: Clauses) -> Union[Model, bool]:
+    """
+    Drop-in replacement for dpll_satisfiable backed by the trail-based IterativeDPLL.
+    Returns a satisfying model if satisfiable, otherwise returns False.
+    """
+    symbols = SymbolTable()
+    result = IterativeDPLL([symbols.encode_clause(clause) for clause in clauses]).solve()
+    if result is None:
+        return False
+    return dict(symbols.decode_literal(lit) for lit in result)
+
+def int_dpll_satisfiable(clauses: Iterable[Sequence[int]], stats: Optional[SolverStats] = None,
+                         budget: Optional[SearchBudget] = None) -> Union[Set[int], bool]:
+    """
+    Same algorithm as dpll_satisfiable, but over int-encoded clauses.
+    Returns the set of true literals of a satisfying model, otherwise returns False.
+    If stats is given, the search counters are added to it. If the budget runs
+    out, BudgetExhausted is raised.
+    """
+    if stats is not None:
+        stats.searches += 1
+    return int_dpll([tuple(clause) for clause in clauses], set(), stats, budget)
+
+def int_dpll(clauses: List[IntClause], model: Set[int], stats: Optional[SolverStats] = None,
+             budget: Optional[SearchBudget] = None) -> Union[Set[int], bool]:
+    """
+    DPLL recursive helper func for int literals.
+    The model is the set of literals assigned true.
+    """
+    if stats is not None:
+        # Every recursive call assigns one more symbol, so the depth is the model size
+        stats.max_depth = max(stats.max_depth, len(model))
+        stats.clauses_scanned += len(clauses)
+    unknown_clauses = [] # Clauses that are not yet true
+
+    for clause in clauses:
+        new_clause = []
+        for lit in clause:
+            if lit in model:
+                break # Literal true -> clause true
+            if -lit not in model:
+                new_clause.append(lit) # This literal is unassigned
+        else:
+            if not new_clause:
+                if stats is not None:
+                    stats.conflicts += 1
+                return False # Contradiction: clause is false
+            unknown_clauses.append(tuple(new_clause))
+
+    if not unknown_clauses:
+        return model # All clauses were satisfied
+
+    # Heuristic: Pure Symbol Elimination
+    lits_in_unknown = set(lit for clause in unknown_clauses for lit in clause)
+    for lit in lits_in_unknown:
+        if -lit not in lits_in_unknown: # It's a pure symbol
+            if stats is not None:
+                stats.pure_literals += 1
+            if budget is not None:
+                budget.charge(propagations=1)
+            return int_dpll(unknown_clauses, model | {lit}, stats, budget)
+
+    # Heuristic: Unit Clause Propagation
+    for clause in unknown_clauses:
+        if len(clause) == 1:
+            if stats is not None:
+                stats.propagations += 1
+            if budget is not None:
+                budget.charge(propagations=1)
+            return int_dpll(unknown_clauses, model | {clause[0]}, stats, budget)
+
+    # Branching: Pick a symbol and try both True/ False
+    if stats is not None:
+        stats.decisions += 1
+    if budget is not None:
+        budget.charge(decisions=1)
+    var = abs(next(iter(lits_in_unknown)))
+    res = int_dpll(unknown_clauses, model | {var}, stats, budget)
+    if res:
+        return res
+    return int_dpll(unknown_clauses, model | {-var}, stats, budget)
+
+
+# SAT engine registry. An engine takes int-encoded clauses and returns the true
+# literals of a model, or None if they are unsatisfiable. It adds its counters to
+# stats and raises BudgetExhausted when the budget runs out (both optional), and
+# ignores the options it does not know (e.g. heuristic).
+SatEngine = Callable[..., Optional[Set[int]]]
+
+def reference_engine(clauses: List[IntClause], stats: Optional[SolverStats] = None,
+                     budget: Optional[SearchBudget] = None, **options) -> Optional[Set[int]]:
+    """The original string-literal dpll_satisfiable, for cross-checking. Ignores stats and budget."""
+    model = dpll_satisfiable(set(frozenset((str(abs(lit)), lit > 0) for lit in clause) for clause in clauses))
+    if model is False:
+        return None
+    return set(int(sym) if value else -int(sym) for sym, value in model.items())
+
+def dpll_engine(clauses: List[IntClause], stats: Optional[SolverStats] = None,
+                budget: Optional[SearchBudget] = None, **options) -> Optional[Set[int]]:
+    model = int_dpll_satisfiable(clauses, stats, budget)
+    return model if model is not False else None
+
+def iterative_engine(clauses: List[IntClause], stats: Optional[SolverStats] = None,
+                     budget: Optional[SearchBudget] = None, heuristic: str = "first", **options) -> Optional[Set[int]]:
+    solver = IterativeDPLL(clauses, heuristic)
+    model = solver.solve(budget)
+    if stats is not None:
+        stats.add_solver(solver)
+    return set(model) if model is not None else None
+
+def cdcl_engine(clauses: List[IntClause], stats: Optional[SolverStats] = None,
+                budget: Optional[SearchBudget] = None, **options) -> Optional[Set[int]]:
+    solver = CDCLSolver(clauses)
+    satisfiable = solver.solve((), budget)
+    if stats is not None:
+        stats.add_solver(solver)
+    return set(solver.model) if satisfiable else None
+
+SAT_ENGINES: Dict[str, SatEngine] = {
+    "reference": reference_engine,
+    "dpll": dpll_engine,
+    "iterative": iterative_engine,
+    "cdcl": cdcl_engine,
+}
+
+def register_engine(name: str, engine: SatEngine):
+    """Make an engine available to KnowledgeBase(solver=name) and the fuzz harness."""
+    SAT_ENGINES[name] = engine
+
+
+class SymbolTable:
+    """
+    Interns symbol names (e.g. "P_3_7") as dense ints starting from 1.
+    A literal (sym, True) is encoded as +id and (sym, False) as -id.
+    """
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = [""] # Index 0 is unused, 0 is never a literal
+
+    def __len__(self) -> int:
+        return len(self._names) - 1
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._ids
+
+    def intern(self, symbol: str) -> int:
+        var = self._ids.get(symbol)
+        if var is None:
+            var = len(self._names)
+            self._ids[symbol] = var
+            self._names.append(symbol)
+        return var
+
+    def get(self, symbol: str) -> Optional[int]:
+        return self._ids.get(symbol)
+
+    def names(self) -> List[str]:
+        """Symbol names in id order: names()[i - 1] is the symbol of variable i."""
+        return self._names[1:]
+
+    def name(self, var: int) -> str:
+        return self._names[abs(var)]
+
+    def encode_literal(self, lit: Literal) -> IntLiteral:
+        sym, val = lit
+        var = self.intern(sym)
+        return var if val else -var
+
+    def decode_literal(self, lit: IntLiteral) -> Literal:
+        return (self._names[abs(lit)], lit > 0)
+
+    def encode_clause(self, clause: Clause) -> IntClause:
+        return tuple(sorted(set(self.encode_literal(lit) for lit in clause)))
+
+    def decode_clause(self, clause: Sequence[int]) -> Clause:
+        return frozenset(self.decode_literal(lit) for lit in clause)
+
+
+class ClauseArena:
+    """
+    Stores every clause back to back in one flat array('i').
+    Clause i is literals[offsets[i]:offsets[i + 1]].
+    """
     def __init__(self):
-        self.clauses: Clauses = set()
+        self.literals = array('i')
+        self.offsets = array('i', [0])
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> IntClause:
+        return tuple(self.literals[self.offsets[index]:self.offsets[index + 1]])
+
+    def __iter__(self) -> Iterator[IntClause]:
+        lits, offsets = self.literals, self.offsets
+        for i in range(len(offsets) - 1):
+            yield tuple(lits[offsets[i]:offsets[i + 1]])
+
+    def add(self, clause: Sequence[int]) -> int:
+        """Append a clause and return its index."""
+        self.literals.extend(clause)
+        self.offsets.append(len(self.literals))
+        return len(self.offsets) - 2
+
+    def nbytes(self) -> int:
+        return (len(self.literals) + len(self.offsets)) * self.literals.itemsize
+
+
+class KnowledgeBase:
+    SOLVERS = ("dpll", "iterative", "cdcl") # Production engines; any name in SAT_ENGINES is accepted
+
+    SIMPLIFY_INTERVAL = 32 # New clauses between two periodic simplification passes
+
+    def __init__(self, solver: str = "iterative", cache_size: int = 1024, model_pool_size: int = 8,
+                 simplify: bool = True, heuristic: str = "first", instrument: bool = False,
+                 recorder: Optional[ProblemRecorder] = None,
+                 persistent_cache: Optional[PersistentEntailmentCache] = None,
+                 executor: Optional["ParallelAsker"] = None, slicer: Optional["CellClauseIndex"] = None):
+        """
+        Propositional KB answering entailment queries by refutation with the solver engine.
+        The optional collaborators (recorder, persistent_cache, executor, slicer) are off when None.
+        """
+        if solver not in SAT_ENGINES:
+            raise ValueError(f"Unknown solver {solver!r}, expected one of {tuple(SAT_ENGINES)}")
+        if heuristic not in HEURISTICS:
+            raise ValueError(f"Unknown heuristic {heuristic!r}, expected one of {tuple(HEURISTICS)}")
+        # SAT engine of ask(): "dpll" (recursive), "iterative" (trail-based, the default), "cdcl"
+        # (one incremental session, solved under assumptions) or "reference" (slow, for cross-checking)
+        self.solver = solver
+        self.heuristic = heuristic # Branching heuristic of the "iterative" engine, one of HEURISTICS
+        self.symbols = SymbolTable()
+        self.arena = ClauseArena()
+        self._clause_keys: Set[IntClause] = set() # For de-duplication, like the old set of clauses
+        self._owners: Dict[IntClause, Set[str]] = {} # Layers holding a retractable clause; permanent ones are absent
+        self._layers: Dict[str, Set[IntClause]] = {} # layer -> clauses told with it
+        self.retractions = 0 # retract() calls that removed clauses
+        self.unit_closure = UnitClosure() # Literals implied by unit propagation alone
+        # Simplified working clauses the solvers see (simplify=False leaves them as told); arena keeps the clauses as told
+        self.simplifier = CNFSimplifier(eliminable=self._is_percept_var, enabled=simplify)
+        self.components = ComponentIndex() # Variable-connected components of the working clauses
+        self._units_applied = 0 # Prefix of unit_closure.trail already given to the simplifier
+        self._since_simplify = 0
+        self.unit_hits = 0 # Asks answered from the closure, without search
+        self.two_sat_solves = 0 # Residual problems solved by the linear-time 2-SAT path
+        self._session: Optional[CDCLSolver] = CDCLSolver() if solver == "cdcl" else None
+        self.instrument = instrument # Collect search counters (see solver_stats.py); off, ask() does no extra work
+        self.last_ask: Optional[SolverStats] = None
+        self._stats = SolverStats() # Accumulated since the last pop_stats()
+        self._ask_stats: Optional[SolverStats] = None # Counters of the ask in progress, if instrumented
+        self._budget: Optional[SearchBudget] = None # Budget of the ask in progress
+        self.budget_exhausted = 0 # Asks left unknown because their budget ran out
+        self.recorder = recorder # Receives every decided entailment problem as DIMACS (see dimacs.py)
+        self.persistent_cache = persistent_cache # On-disk verdicts shared across runs (see entailment_store.py)
+        self._digest = 0 # Order-independent hash of the told clauses, kept only with a persistent cache
+        self.executor = executor # ParallelAsker for large ask_many() batches (see parallel_ask.py)
+        self.unknown: Set[Literal] = set() # Literals the last ask_many left unknown
+        self.slicer = slicer # Tries the clauses near the query cell before a full search (see relevance_slice.py)
+        self.slice_hits = 0 # Entailments proved on a relevance slice
+        self.core_hits = 0 # "Entailed" verdicts kept through a retraction by their unit-derivation core
 
-    def tell(self, clause: Clause):
-        """Add one CNF clause (a frozenset of literals)."""
-        self.clauses.add(clause)
+        # Entailment cache: query -> (version, verdict). Every clause added by tell()
+        # bumps the version, so a "not entailed" verdict is only reused at the same
+        # version. Entailment is monotonic under tell, so an "entailed" verdict stays
+        # valid for the lifetime of the KB.
+        self.version = 0
+        self.cache_size = cache_size # Bound of the LRU verdict cache; 0 disables it
+        self._cache: "OrderedDict[IntClause, Tuple[int, bool]]" = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        # Pool of recent models of KB AND ~query, most recent first. Each entry is
+        # [number of arena clauses the model was checked against, set of true literals].
+        self.model_pool_size = model_pool_size # 0 disables the pool
+        self._model_pool: List[list] = []
+        self.model_pool_hits = 0
+
+    @property
+    def clauses(self) -> Clauses:
+        """The KB as a set of symbolic clauses (decoded from the arena)."""
+        return set(self.symbols.decode_clause(clause) for clause in self.arena)
+
+    def tell(self, clause: Clause, layer: Optional[str] = None):
+        """
+        Add one CNF clause (a frozenset of literals). A clause told with a layer
+        leaves the KB on retract(layer), unless a tell without a layer or with
+        another layer still holds it.
+        """
+        key = self.symbols.encode_clause(clause)
+        if key in self._clause_keys:
+            owners = self._owners.get(key)
+            if owners is not None:
+                if layer is None:
+                    del self._owners[key] # Now permanent
+                else:
+                    owners.add(layer)
+                    self._layers.setdefault(layer, set()).add(key)
+            return
+        if layer is not None:
+            self._owners[key] = {layer}
+            self._layers.setdefault(layer, set()).add(key)
+        self._add_key(key)
+        self._sync_simplifier()
+        self.version += 1
+        if self.persistent_cache is not None:
+            self._digest = (self._digest + literal_set_hash(clause)) % DIGEST_MOD
+
+    def _add_key(self, key: IntClause):
+        self._clause_keys.add(key)
+        self.arena.add(key)
+        self.unit_closure.add_clause(key)
+        self.simplifier.add(key)
+        self._since_simplify += 1
+        if self._session is not None:
+            self._session.add_clause(key)
+
+    def retract(self, *layers: str) -> int:
+        """Take back the clauses told with the given layers, in one rebuild. Returns how many clauses left the KB."""
+        removed = set()
+        for layer in layers:
+            for key in self._layers.pop(layer, ()):
+                owners = self._owners.get(key)
+                if owners is None:
+                    continue # Told again without a layer
+                owners.discard(layer)
+                if not owners:
+                    del self._owners[key]
+                    removed.add(key)
+        if removed:
+            self._remove_clauses(removed)
+        return len(removed)
+
+    def _remove_clauses(self, removed: Set[IntClause]):
+        """
+        Rebuild the derived state (closure, working clauses, components, session)
+        from the surviving clauses. Symbols keep their ids. Fewer clauses entail
+        less, so "not entailed" verdicts of the current version stay valid and so
+        do pooled models. An "entailed" verdict stays if unit propagation derived
+        it from told clauses that all survive (its core), which alone entail it.
+        Otherwise it stays if the KB is known to be consistent and no retracted
+        clause is in its component of the told clauses: it was derived from that
+        component alone.
+        """
+        told = ComponentIndex()
+        for i, clause in enumerate(self.arena):
+            told.add_clause(i, clause)
+        affected = told.roots_of(lit for key in removed for lit in key)
+        arena_size = len(self.arena)
+        consistent = (any(checked == arena_size for checked, _ in self._model_pool)
+                      or any(not entailed and version == self.version for version, entailed in self._cache.values()))
+        version = self.version + 1
+        closure = self.unit_closure
+        lost, untracked = closure.lost_support(removed, self._clause_keys) if not closure.conflict else (set(), set())
+        for query_key, (cached_version, entailed) in list(self._cache.items()):
+            if entailed:
+                # Unit-derived from surviving told clauses, or else (search, simplifier units) by component
+                keep = (not closure.conflict and all(lit in closure.implied and lit not in lost
+                                                     and lit not in untracked for lit in query_key))
+                if keep:
+                    self.core_hits += 1
+                else:
+                    keep = consistent and not told.roots_of(query_key) & affected
+            else:
+                keep = cached_version == self.version
+            if keep:
+                self._cache[query_key] = (version, entailed)
+            else:
+                del self._cache[query_key]
+
+        survivors = [] # Surviving clauses, and how many of them precede each old index
+        kept_before = [0]
+        for clause in self.arena:
+            if clause not in removed:
+                survivors.append(clause)
+            kept_before.append(len(survivors))
+        for entry in self._model_pool:
+            entry[0] = kept_before[entry[0]]
+
+        frozen = self.simplifier.frozen
+        self.arena = ClauseArena()
+        self._clause_keys = set()
+        self.unit_closure = UnitClosure()
+        self.simplifier = CNFSimplifier(eliminable=self._is_percept_var, enabled=self.simplifier.enabled)
+        self.simplifier.frozen = frozen
+        self.components = ComponentIndex()
+        self._units_applied = 0
+        self._since_simplify = 0
+        if self._session is not None:
+            self._session = CDCLSolver()
+        for key in survivors:
+            self._add_key(key)
+        self._sync_simplifier()
+        self.version = version
+        self.retractions += 1
+        if self.persistent_cache is not None:
+            for key in removed:
+                self._digest = (self._digest - literal_set_hash(self.symbols.decode_clause(key))) % DIGEST_MOD
+
+    def _is_percept_var(self, var: int) -> bool:
+        return self.symbols.name(var)[:2] in ("B_", "S_")
+
+    def _sync_simplifier(self):
+        """Exchange units between the closure and the simplifier, then index new working clauses."""
+        simplifier = self.simplifier
+        while True:
+            trail = self.unit_closure.trail
+            if self._units_applied < len(trail):
+                new_units = trail[self._units_applied:]
+                self._units_applied = len(trail)
+                simplifier.apply_units(new_units)
+            elif simplifier.new_units:
+                # Units found by probing or elimination are implied by the KB too
+                for lit in simplifier.new_units:
+                    self.unit_closure.add_clause((lit,))
+                simplifier.new_units.clear()
+            else:
+                break
+        if simplifier.unsat:
+            self.unit_closure.add_clause(())
+        for cid in simplifier.added:
+            if cid in simplifier.clauses:
+                self.components.add_clause(cid, simplifier.clauses[cid])
+        simplifier.added.clear()
+        # A unit that satisfies or shrinks a clause of a component can falsify its cached model
+        self.components.drop_models(simplifier.removed)
+        simplifier.removed.clear()
+
+    def simplify(self):
+        """Run the periodic simplification passes (variable elimination, probing)."""
+        self.simplifier.simplify()
+        self._sync_simplifier()
+        self._since_simplify = 0
+
+    def simplify_stats(self) -> Dict[str, int]:
+        stats = dict(self.simplifier.stats)
+        stats["told_clauses"] = len(self.arena)
+        stats["working_clauses"] = len(self.simplifier)
+        stats["told_vars"] = len(self.symbols)
+        stats["working_vars"] = self.simplifier.num_vars()
+        return stats
+
+    def to_dimacs(self, query: Optional[Clause] = None) -> str:
+        """The told clauses as DIMACS CNF, plus the negated query clause if one is given."""
+        clauses = list(self.arena)
+        if query is not None:
+            clauses.append(tuple(-lit for lit in self.symbols.encode_clause(query)))
+        return to_dimacs(clauses, len(self.symbols))
+
+    def dump_dimacs(self, path: str, query: Optional[Clause] = None):
+        """Write to_dimacs() to path and the symbol map next to it (same name, .json)."""
+        text = self.to_dimacs(query) # Encoding the query may intern new symbols
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        with open(sidecar_path(path), 'w', encoding='utf-8') as f:
+            json.dump({"symbols": {str(i + 1): name for i, name in enumerate(self.symbols.names())},
+                       "query": sorted([sym, value] for sym, value in query) if query is not None else None},
+                      f, indent=1)
 
     def tell_all(self, clauses: List[Clause]):
         """Add multiple clauses at once."""
-        self.clauses.update(clauses)
+        for clause in clauses:
+            self.tell(clause)
 
-    def ask(self, query: Clause) -> bool:
+    def ask(self, query: Clause, budget: Optional[SearchBudget] = None) -> Optional[bool]:
         """
         Return True if KB ENTAILS query using DPLL.
         This checks if (KB AND ~query) is unsatisfiable.
+        With a budget the result is three-valued: None means the budget ran out
+        before the search could decide (unknown). Unknown verdicts are not cached.
+        """
+        self._begin_ask()
+        query_key = self.symbols.encode_clause(query)
+        cached = self._cache_lookup(query_key)
+        if cached is not None:
+            self._end_ask()
+            return cached
+
+        if self._unit_implied(query_key):
+            entailed = True
+        else:
+            entailed = self._persistent_lookup(query_key)
+        if entailed is None:
+            self._start_budget(budget)
+            try:
+                entailed = self._refuting_model(query_key) is None
+                self._persistent_store(query_key, entailed)
+            except BudgetExhausted:
+                pass
+            finally:
+                self._budget = None
+        if entailed is None:
+            self._count_unknown(1)
+        else:
+            self._cache_store(query_key, entailed)
+        self._end_ask()
+        return entailed
+
+    def ask_many(self, queries: Iterable[Literal], budget: Optional[SearchBudget] = None) -> Set[Literal]:
+        """
+        Return the subset of the query literals that the KB entails, in one pass.
+        Works like a backbone computation: every model found for KB AND ~l also
+        rules out each other pending literal that is false (or free) in that model,
+        so most candidates are settled without a solve of their own.
+        The budget covers the whole batch: literals still pending when it runs
+        out are unknown, left out of the result and listed in self.unknown.
         """
+        self.unknown = set()
+        entailed: Set[Literal] = set()
+        pending: List[Tuple[Literal, IntClause]] = []
+        settled = 0 # Queries answered without a search
+        for lit in queries:
+            query_key = (self.symbols.encode_literal(lit),)
+            cached = self._cache_lookup(query_key)
+            if cached is None and self._unit_implied(query_key):
+                self._cache_store(query_key, True)
+                cached = True
+            if cached is None:
+                cached = self._persistent_lookup(query_key)
+                if cached is not None:
+                    self._cache_store(query_key, cached)
+            if cached is None:
+                pending.append((lit, query_key))
+                continue
+            settled += 1
+            if cached:
+                entailed.add(lit)
+
+        if pending and self.executor is not None and self.executor.should_dispatch(len(pending)):
+            parallel_entailed, parallel_unknown, failed, worker_stats = self.executor.ask_many(
+                self, [lit for lit, _ in pending], budget)
+            failed = set(failed)
+            for lit, query_key in pending:
+                if lit not in parallel_unknown and lit not in failed:
+                    self._cache_store(query_key, lit in parallel_entailed)
+                    self._persistent_store(query_key, lit in parallel_entailed)
+            # The workers' counters already count their asks and budget-unknown queries
+            self.unknown = set(parallel_unknown)
+            self.budget_exhausted += len(parallel_unknown)
+            if worker_stats is not None:
+                self._stats.add(worker_stats)
+            entailed |= parallel_entailed
+            pending = [(lit, query_key) for lit, query_key in pending if lit in failed] # Solved here instead
+
+        self._start_budget(budget)
+        while pending:
+            lit, query_key = pending.pop()
+            self._begin_ask()
+            try:
+                model = self._refuting_model(query_key)
+            except BudgetExhausted:
+                self._end_ask()
+                exhausted = set(other_lit for other_lit, _ in pending)
+                exhausted.add(lit)
+                self.unknown |= exhausted
+                self._count_unknown(len(exhausted))
+                break
+            self._end_ask()
+            if model is None:
+                entailed.add(lit)
+                self._cache_store(query_key, True)
+                self._persistent_store(query_key, True)
+                continue
+            self._cache_store(query_key, False)
+            self._persistent_store(query_key, False)
+            still_pending = []
+            for other_lit, other_key in pending:
+                if other_key[0] not in model:
+                    self._cache_store(other_key, False) # Refuted by the same model
+                    self._persistent_store(other_key, False)
+                    settled += 1
+                else:
+                    still_pending.append((other_lit, other_key))
+            pending = still_pending
+        self._budget = None
+        if self.instrument:
+            self._stats.asks += settled
+        return entailed
+
+    def _persistent_key(self, query_key: IntClause) -> str:
+        query_hash = literal_set_hash(self.symbols.decode_literal(lit) for lit in query_key)
+        return PersistentEntailmentCache.key(self._digest, query_hash)
+
+    def _persistent_lookup(self, query_key: IntClause) -> Optional[bool]:
+        if self.persistent_cache is None:
+            return None
+        return self.persistent_cache.get(self._persistent_key(query_key))
+
+    def _persistent_store(self, query_key: IntClause, entailed: bool):
+        if self.persistent_cache is not None:
+            self.persistent_cache.put(self._persistent_key(query_key), entailed)
+
+    def _start_budget(self, budget: Optional[SearchBudget]):
+        self._budget = budget
+        if budget is not None:
+            budget.start()
+
+    def _count_unknown(self, count: int):
+        self.budget_exhausted += count
+        if self.instrument:
+            self._stats.budget_exhausted += count
+
+    def _begin_ask(self):
+        if self.instrument:
+            self._ask_stats = SolverStats()
+            self._ask_stats.asks = 1
+            self._ask_stats.start()
+
+    def _end_ask(self):
+        stats = self._ask_stats
+        if stats is not None:
+            stats.stop()
+            self._stats.add(stats)
+            self.last_ask = stats
+            self._ask_stats = None
+
+    def pop_stats(self) -> SolverStats:
+        """Return the search counters accumulated since the previous call and start over."""
+        stats, self._stats = self._stats, SolverStats()
+        return stats
+
+    def _unit_implied(self, query_key: IntClause) -> bool:
+        """Fast path: every query literal already follows from the KB by unit propagation."""
+        if all(lit in self.unit_closure for lit in query_key):
+            self.unit_hits += 1
+            return True
+        return False
+
+    def _refuting_model(self, query_key: IntClause) -> Optional[Set[int]]:
+        """Return a model of KB AND ~query as a set of true literals, or None if KB entails query."""
         # Negate query: ~(L1 ∧ … ∧ Ln) = ~L1 ∨ … ∨ ~Ln
-        negated_query_clause = frozenset(negate_literal(lit) for lit in query)
+        negated_query_clause = tuple(-lit for lit in query_key)
+
+        # A known model of the KB that also satisfies ~query already proves non-entailment
+        model = self._pool_refutes(negated_query_clause)
+        if model is not None:
+            self.model_pool_hits += 1
+            return model
+
+        if self.slicer is not None and not self.unit_closure.conflict:
+            relevant = self.slicer.slice(self, query_key)
+            if relevant is not None:
+                sliced, model = self._slice_model(relevant[0], relevant[1], negated_query_clause)
+                if sliced:
+                    self.slice_hits += 1
+                    if model is not None:
+                        self._pool_add(model)
+                    return model
+
+        if self._session is not None:
+            model = self._session_model(negated_query_clause)
+        else:
+            model = self._component_model(negated_query_clause)
+
+        # If the clauses are unsatisfiable -> KB entails query.
+        if model is not None:
+            self._pool_add(model)
+        return model
+
+    def _slice_model(self, clauses: List[IntClause], boundary: Set[int],
+                     negated_query_clause: IntClause) -> Tuple[bool, Optional[Set[int]]]:
+        """
+        Try to settle KB AND ~query on a slice of the KB. Returns (settled, model):
+        the slice is unsatisfiable with ~query (entailed, no model), or a model of
+        it that keeps a pooled KB model's values on the boundary combines with the
+        rest of that model into a model of KB AND ~query. (False, None) if neither.
+        """
+        clauses = clauses + [negated_query_clause]
+        if self._residual_model(clauses) is None:
+            return True, None
+        if not self._model_pool:
+            return False, None
+        known = self._model_pool[0][1] # Brought up to date by _pool_refutes
+        pinned = [(lit,) for lit in known if abs(lit) in boundary]
+        model = self._residual_model(clauses + pinned)
+        if model is None:
+            return False, None
+        inside = set(abs(lit) for clause in clauses for lit in clause)
+        model |= self.unit_closure.implied
+        model.update(lit for lit in known if abs(lit) not in inside)
+        return True, model
+
+    def _cache_lookup(self, query_key: IntClause) -> Optional[bool]:
+        if self.cache_size <= 0:
+            return None
+        entry = self._cache.get(query_key)
+        if entry is not None:
+            version, entailed = entry
+            if entailed or version == self.version:
+                self._cache.move_to_end(query_key)
+                self.cache_hits += 1
+                return entailed
+        self.cache_misses += 1
+        return None
+
+    def _cache_store(self, query_key: IntClause, entailed: bool):
+        # Called once for every verdict the KB had to work out (not for cache hits)
+        if self.recorder is not None:
+            self.recorder.record(self.arena, tuple(-lit for lit in query_key), self.symbols.names(),
+                                 [self.symbols.decode_literal(lit) for lit in query_key], entailed)
+        if self.cache_size <= 0:
+            return
+        self._cache[query_key] = (self.version, entailed)
+        self._cache.move_to_end(query_key)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def cache_stats(self) -> Dict[str, int]:
+        return {"hits": self.cache_hits, "misses": self.cache_misses, "size": len(self._cache),
+                "model_pool_hits": self.model_pool_hits, "unit_hits": self.unit_hits,
+                "two_sat_solves": self.two_sat_solves, "budget_exhausted": self.budget_exhausted,
+                "slice_hits": self.slice_hits, "core_hits": self.core_hits,
+                "persistent_hits": self.persistent_cache.hits if self.persistent_cache is not None else 0}
+
+    def _pool_add(self, model: Set[int]):
+        if self.model_pool_size <= 0:
+            return
+        self._model_pool.insert(0, [len(self.arena), model])
+        del self._model_pool[self.model_pool_size:]
+
+    def _pool_refutes(self, negated_query_clause: IntClause) -> Optional[Set[int]]:
+        """
+        Look for a pooled model that satisfies ~query and return it. Models are first brought up
+        to date with clauses told since they were found: a clause with an unassigned
+        literal extends the (partial) model, a falsified clause evicts it.
+        """
+        arena_size = len(self.arena)
+        pool = []
+        for entry in self._model_pool:
+            checked, model = entry
+            if all(self._extend_model(model, self.arena[i]) for i in range(checked, arena_size)):
+                entry[0] = arena_size
+                pool.append(entry)
+        self._model_pool = pool
+
+        for i, (_, model) in enumerate(pool):
+            model = set(model)
+            if self._extend_model(model, negated_query_clause):
+                pool.insert(0, pool.pop(i))
+                return model
+        return None
+
+    @staticmethod
+    def _extend_model(model: Set[int], clause: Sequence[int]) -> bool:
+        """Make sure the model satisfies the clause, assigning a free literal if needed."""
+        free = 0
+        for lit in clause:
+            if lit in model:
+                return True
+            if not free and -lit not in model:
+                free = lit
+        if free:
+            model.add(free)
+            return True
+        return False
+
+    def _component_model(self, negated_query_clause: IntClause) -> Optional[Set[int]]:
+        """
+        Solve KB AND ~query on the components the query touches only. The other
+        components share no symbol with it: they only matter when one of them is
+        unsatisfiable on its own (then the KB entails everything), and their
+        verdicts and models are cached until a new clause reaches them.
+        """
+        for lit in negated_query_clause:
+            self.simplifier.freeze(abs(lit))
+        if self._since_simplify >= self.SIMPLIFY_INTERVAL:
+            self.simplify()
+        else:
+            self._sync_simplifier()
+        if self.unit_closure.conflict:
+            return None
+        query_roots = self.components.roots_of(negated_query_clause)
+        # Combine the relevant KB clauses with the negated query (KB AND ~query)
+        clauses_to_check = self._working_clauses(query_roots)
+        clauses_to_check.append(negated_query_clause)
+        model = self._residual_model(clauses_to_check)
+        if model is None:
+            return None
+
+        implied = self.unit_closure.implied
+        for root in self.components.roots():
+            if root in query_roots:
+                continue
+            component_model = self.components.models.get(root)
+            if (root not in self.components.models
+                    or (component_model is not None and any(-lit in implied for lit in component_model))):
+                component_model = self._residual_model(self._working_clauses([root]))
+                self.components.models[root] = component_model
+            if component_model is None:
+                return None # The KB itself is unsatisfiable
+            model |= component_model
+        model |= implied
+        return self.simplifier.extend_model(model)
+
+    def _working_clauses(self, roots: Iterable[int]) -> List[IntClause]:
+        working = self.simplifier.clauses
+        return [working[cid] for cid in self.components.clause_indices(roots) if cid in working]
+
+    def _residual_model(self, clauses: List[IntClause]) -> Optional[Set[int]]:
+        """
+        Simplify the clauses by the unit closure (drop satisfied clauses, strip
+        false literals) and solve what is left. Without long clauses (breeze and
+        stench implications) the residual is 2-SAT and is solved in linear time;
+        otherwise it goes to the selected engine.
+        The model does not include the implied literals themselves.
+        """
+        implied = self.unit_closure.implied
+        residual = []
+        for clause in clauses:
+            if any(lit in implied for lit in clause):
+                continue
+            reduced = tuple(lit for lit in clause if -lit not in implied)
+            if not reduced:
+                return None
+            residual.append(reduced)
+        if is_two_sat(residual):
+            self.two_sat_solves += 1
+            if self._ask_stats is not None:
+                self._ask_stats.searches += 1
+            return two_sat_model(residual)
+        return self._find_model(residual)
 
-        # Combine KB clauses with the negated query (KB AND ~query)
-        clauses_to_check = set(self.clauses)
-        clauses_to_check.add(negated_query_clause)
+    def _session_model(self, negated_query_clause: IntClause) -> Optional[Set[int]]:
+        """Solve KB AND ~query in the persistent session, with ~query as assumptions."""
+        stats = self._ask_stats
+        if stats is not None:
+            before = SolverStats.snapshot(self._session)
+            self._session.max_depth = 0
+        # A disjunction cannot be assumed directly, but KB AND (~L1 v ... v ~Ln) is satisfiable
+        # iff some KB AND ~Li is: assume one literal at a time, which adds nothing to the session
+        satisfiable = False
+        for lit in negated_query_clause:
+            if self._session.solve((lit,), self._budget):
+                satisfiable = True
+                break
+        if stats is not None:
+            stats.add_solver(self._session, before)
+        return set(self._session.model) if satisfiable else None
 
-        # If dpll_satisfiable returns False -> clause is unsatisfiable.
-        # SO KB entails query.
-        return not dpll_satisfiable(clauses_to_check)
\ No newline at end of file
+    def _find_model(self, clauses: List[IntClause]) -> Optional[Set[int]]:
+        """Solve from scratch with the selected engine. Returns the true literals of a model, or None."""
+        return SAT_ENGINES[self.solver](clauses, self._ask_stats, self._budget, heuristic=self.heuristic)
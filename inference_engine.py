@@ -1,20 +1,62 @@
 from agent_knowledge import MapKnowledge, CellStatus
 from inference import KnowledgeBase
-from typing import Optional, Set, Tuple
+from solver_stats import SolverStats
+from search_budget import SearchBudget
+from dimacs import ProblemRecorder
+from entailment_store import PersistentEntailmentCache
+from parallel_ask import ParallelAsker
+from model_counting import WeightedModelCounter
+from relevance_slice import CellClauseIndex
+from verdict_memo import VerdictMemo
+from typing import Dict, List, Optional, Set, Tuple
 from environment import Percept, Direction
 
 class InferenceEngine:
-    def __init__(self, knowledge: MapKnowledge):
+    PIT_LAYER = "pit" # KB layer of the pit facts, kept across wumpus resets (pits never move)
+    START_LAYER = "wumpus_start" # KB layer of the initial ~W_0_0, dropped by the first reset
+
+    def __init__(self, knowledge: MapKnowledge, solver: str = "iterative", instrument: bool = False,
+                 budget: Optional[SearchBudget] = None, recorder: Optional[ProblemRecorder] = None,
+                 persistent_cache: Optional[PersistentEntailmentCache] = None,
+                 executor: Optional[ParallelAsker] = None, eliminate_percepts: bool = True,
+                 slice_radius: Optional[int] = None, memoize: bool = True):
         self.knowledge = knowledge
+        self.solver = solver # SAT engine used by the KnowledgeBase, see KnowledgeBase.SOLVERS
+        self.instrument = instrument # Collect search counters (see solver_stats.py)
+        self.inference_stats: List[SolverStats] = [] # One entry per run_inference call
+        self.episode_stats = SolverStats() # Sum over the episode, across KB resets
+        self.budget = budget # Search budget of each run_inference batch; None is unbounded
+        self.recorder = recorder # Records the entailment problems as DIMACS, shared by every KB of the episode
+        self.persistent_cache = persistent_cache # On-disk verdict cache shared across runs
+        self.executor = executor # Process pool for large query batches (opt-in), see parallel_ask.py
+        # Tell percepts as clauses over their causes; False keeps the B_/S_ biconditional encoding
+        self.eliminate_percepts = eliminate_percepts
+        # Spatial index for relevance-sliced asks within slice_radius hops of the query cell; None asks the full KB
+        self.slicer = CellClauseIndex(slice_radius) if slice_radius is not None else None
+        # Skip cells whose verdicts no new clause can have changed; None asks every neighbour every step
+        self.memo = VerdictMemo() if memoize else None
+        self.skipped_asks = 0 # Asks saved this episode: 1 per settled pit, 2 per settled wumpus, 4 per memoized cell
         self.kb: Optional[KnowledgeBase] = None
-        self.processed_cells: Set[Tuple[int, int]] = set()
+        self.pit_cells: Set[Tuple[int, int]] = set() # Visited cells whose pit facts are in the KB
+        # Visited cells whose wumpus facts are in the KB (layer "wumpus_x_y") -> the stench reading told
+        self.wumpus_cells: Dict[Tuple[int, int], Optional[bool]] = {}
         self.initial_kb_setup_done = False
 
     @staticmethod
     def _pos_to_symbol(prefix: str, x: int, y: int) -> str:
         return f"{prefix}_{x}_{y}"
 
-    def _add_biconditional(self, kb: KnowledgeBase, percept_prefix: str, x: int, y: int, cause_prefix: str, has_percept: bool):
+    def _cell_symbols(self, x: int, y: int) -> List[str]:
+        return [self._pos_to_symbol("P", x, y), self._pos_to_symbol("W", x, y)]
+
+    def _cell_queries(self, x: int, y: int) -> List[Tuple[str, bool]]:
+        """P, ~P, W and ~W of a cell."""
+        pit_symbol = self._pos_to_symbol("P", x, y)
+        wumpus_symbol = self._pos_to_symbol("W", x, y)
+        return [(pit_symbol, True), (pit_symbol, False), (wumpus_symbol, True), (wumpus_symbol, False)]
+
+    def _add_biconditional(self, kb: KnowledgeBase, percept_prefix: str, x: int, y: int, cause_prefix: str, has_percept: bool,
+                           layer: Optional[str] = None):
         # if has_percept is None:
         #     return
         p_sym = self._pos_to_symbol(percept_prefix, x, y)
@@ -23,44 +65,65 @@ class InferenceEngine:
         
         # Add P <=> (C1 v C2 v ...)
         if has_percept:
-            kb.tell(frozenset([(p_sym, True)])) # P is true
+            kb.tell(frozenset([(p_sym, True)]), layer) # P is true
             # P => (C1 v C2 v ...)  is  ~P v C1 v C2 v ...
-            kb.tell(frozenset([(p_sym, False)] + [(c, True) for c in cause_symbols]))
+            kb.tell(frozenset([(p_sym, False)] + [(c, True) for c in cause_symbols]), layer)
         elif has_percept is False:
-            kb.tell(frozenset([(p_sym, False)])) # P is false
+            kb.tell(frozenset([(p_sym, False)]), layer) # P is false
             # ~P => ~(C1 v C2 v ...) is ~P => (~C1 ^ ~C2 ^ ...)
             # which means (~P => ~C1), (~P => ~C2), ...
             # which gives (P v ~C1), (P v ~C2), ...
             for cause_sym in cause_symbols:
-                kb.tell(frozenset([(p_sym, True), (cause_sym, False)]))
+                kb.tell(frozenset([(p_sym, True), (cause_sym, False)]), layer)
 
     def _initialize_kb(self):
         if self.kb is None:
-            self.kb = KnowledgeBase()
+            self.kb = KnowledgeBase(self.solver, instrument=self.instrument, recorder=self.recorder,
+                                    persistent_cache=self.persistent_cache, executor=self.executor,
+                                    slicer=self.slicer)
             if not self.initial_kb_setup_done:
                 # Beginning state: (0,0) is safe
-                self.kb.tell(frozenset([(self._pos_to_symbol("P", 0, 0), False)]))
-                self.kb.tell(frozenset([(self._pos_to_symbol("W", 0, 0), False)]))
+                self.kb.tell(frozenset([(self._pos_to_symbol("P", 0, 0), False)]), self.PIT_LAYER)
+                self.kb.tell(frozenset([(self._pos_to_symbol("W", 0, 0), False)]), self.START_LAYER)
                 self.initial_kb_setup_done = True
 
+    def _add_percept(self, kb: KnowledgeBase, percept_prefix: str, x: int, y: int, cause_prefix: str, has_percept: bool,
+                     layer: Optional[str] = None):
+        if not self.eliminate_percepts:
+            self._add_biconditional(kb, percept_prefix, x, y, cause_prefix, has_percept, layer)
+            return
+        # The percept is observed, so substitute its value: B <=> (C1 v C2 v ...) with B known
+        cause_symbols = [self._pos_to_symbol(cause_prefix, nx, ny) for nx, ny in self.knowledge.get_neighbors(x, y)]
+        if has_percept:
+            kb.tell(frozenset((c, True) for c in cause_symbols), layer) # C1 v C2 v ...
+        elif has_percept is False:
+            for cause_sym in cause_symbols:
+                kb.tell(frozenset([(cause_sym, False)]), layer) # ~Ci
+
     def run_inference(self, agent_pos: tuple = None, action_count: int = 0, moving_wumpus_mode: bool = False):
         self._initialize_kb()
         
         # Add facts from visited cells
         for (x, y), cell in self.knowledge.grid.items():
-            if cell.visited and (x, y) not in self.processed_cells:
+            if not cell.visited:
+                continue
+            if (x, y) not in self.pit_cells:
                 # Always add pit information (pits are static)
-                self.kb.tell(frozenset([(self._pos_to_symbol("P", x, y), False)]))
-                self._add_biconditional(self.kb, "B", x, y, "P", cell.breeze)
+                self.kb.tell(frozenset([(self._pos_to_symbol("P", x, y), False)]), self.PIT_LAYER)
+                self._add_percept(self.kb, "B", x, y, "P", cell.breeze, self.PIT_LAYER)
+                self.pit_cells.add((x, y))
 
+            if (x, y) not in self.wumpus_cells:
+                # One layer per cell, so a reset only retracts the cells whose stench it cleared
+                layer = self._pos_to_symbol("wumpus", x, y)
                 if not moving_wumpus_mode:
-                    self.kb.tell(frozenset([(self._pos_to_symbol("W", x, y), False)]))
-                    self._add_biconditional(self.kb, "S", x, y, "W", cell.stench)
-                
+                    self.kb.tell(frozenset([(self._pos_to_symbol("W", x, y), False)]), layer)
+                    self._add_percept(self.kb, "S", x, y, "W", cell.stench, layer)
+
                 if cell.stench is not None:
-                    self._add_biconditional(self.kb, "S", x, y, "W", cell.stench)
-                
-                self.processed_cells.add((x, y))
+                    self._add_percept(self.kb, "S", x, y, "W", cell.stench, layer)
+
+                self.wumpus_cells[(x, y)] = cell.stench
 
         if agent_pos is not None:
             query_cells = self.knowledge.get_neighbors(agent_pos[0], agent_pos[1])
@@ -68,34 +131,117 @@ class InferenceEngine:
             query_cells = [(x, y) for (x, y), cell in self.knowledge.grid.items() if not cell.visited]
         
         # Query adjacent cells
+        cells_to_check = []
         for (x, y) in query_cells:
             cell = self.knowledge.get_cell(x, y)
             if cell is None or cell.visited:
                 continue
-                
+            if self.memo is not None:
+                # An entailed pit or wumpus stays entailed until a reset clears the status;
+                # the old loop stopped after 1 ask on a pit cell and 2 on a wumpus cell
+                if cell.status == CellStatus.PIT:
+                    self.skipped_asks += 1
+                    continue
+                if cell.status == CellStatus.WUMPUS:
+                    self.skipped_asks += 2
+                    continue
+                if self.memo.is_current(self.kb, self._cell_symbols(x, y)):
+                    self.skipped_asks += 4
+                    continue
+            cells_to_check.append((x, y))
+
+        # Classify the whole batch at once: P, W, ~P and ~W for every cell
+        queries = []
+        for (x, y) in cells_to_check:
+            queries.extend(self._cell_queries(x, y))
+        # Queries the budget leaves unknown are treated as not entailed: the cell stays UNKNOWN
+        entailed = self.kb.ask_many(queries, self.budget)
+        if self.instrument:
+            stats = self.kb.pop_stats()
+            self.inference_stats.append(stats)
+            self.episode_stats.add(stats)
+
+        for (x, y) in cells_to_check:
+            pit_symbol = self._pos_to_symbol("P", x, y)
+            wumpus_symbol = self._pos_to_symbol("W", x, y)
             # Check for confirmed pit
-            if self.kb.ask(frozenset([(self._pos_to_symbol("P", x, y), True)])):
+            if (pit_symbol, True) in entailed:
                 self.knowledge.update_cell_status(x, y, CellStatus.PIT)
                 continue
             # Check for confirmed wumpus
-            if self.kb.ask(frozenset([(self._pos_to_symbol("W", x, y), True)])):
+            if (wumpus_symbol, True) in entailed:
                 self.knowledge.update_cell_status(x, y, CellStatus.WUMPUS)
                 continue
 
             # Check for safety (~P ∧ ~W)
-            is_not_pit = self.kb.ask(frozenset([(self._pos_to_symbol("P", x, y), False)]))
-            is_not_wumpus = self.kb.ask(frozenset([(self._pos_to_symbol("W", x, y), False)]))
+            is_not_pit = (pit_symbol, False) in entailed
+            is_not_wumpus = (wumpus_symbol, False) in entailed
             if is_not_pit and is_not_wumpus:
                 self.knowledge.update_cell_status(x, y, CellStatus.SAFE)
 
+        if self.memo is not None:
+            for (x, y) in cells_to_check:
+                if not any(query in self.kb.unknown for query in self._cell_queries(x, y)):
+                    self.memo.record(self.kb, self._cell_symbols(x, y))
+
+    def cell_probabilities(self, cells: List[Tuple[int, int]], pit_prob: float,
+                           num_wumpus: int) -> Dict[Tuple[int, int], Tuple[float, float, float]]:
+        """
+        Exact (P(pit), P(wumpus), P(pit or wumpus)) for each cell, given the KB, by weighted
+        model counting. Every pit symbol has prior pit_prob. The wumpus count enters as an
+        independent prior num_wumpus / (cells - 1) per cell: an exact cardinality
+        constraint would tie every cell into one component and defeat the decomposition.
+        Returns {} if the KB is inconsistent.
+        """
+        self._initialize_kb()
+        kb = self.kb
+        size = self.knowledge.size
+        wumpus_prob = min(1.0, num_wumpus / max(1, size * size - 1))
+        # Symbols the KB never saw get ids past its table, local to this count: no clause
+        # mentions them, so they keep their prior, and the KB's symbol table stays as told
+        ids: Dict[str, int] = {}
+        weights = {}
+        for x in range(size):
+            for y in range(size):
+                for kind, prob in (("P", pit_prob), ("W", wumpus_prob)):
+                    symbol = self._pos_to_symbol(kind, x, y)
+                    var = kb.symbols.get(symbol)
+                    ids[symbol] = var if var is not None else len(kb.symbols) + len(weights) + 1
+                    weights[ids[symbol]] = (prob, 1.0 - prob)
+        queries = []
+        for (x, y) in cells:
+            pit = ids[self._pos_to_symbol("P", x, y)]
+            wumpus = ids[self._pos_to_symbol("W", x, y)]
+            queries.extend([(pit,), (wumpus,), (-pit, -wumpus)])
+        total, probs = WeightedModelCounter(weights).marginals(kb.arena, queries)
+        if total == 0.0:
+            return {}
+        return {cell: (probs[3 * i], probs[3 * i + 1], 1.0 - probs[3 * i + 2]) for i, cell in enumerate(cells)}
+
+    def _retract_stale_wumpus_layers(self):
+        """
+        Retract the wumpus facts of the cells whose stench reading the map knowledge
+        no longer holds; the next run_inference tells them again from the map.
+        The pit layer stays, along with the cached verdicts that only rest on it.
+        """
+        stale = [self.START_LAYER]
+        for (x, y), stench in list(self.wumpus_cells.items()):
+            if self.knowledge.get_cell(x, y).stench != stench:
+                stale.append(self._pos_to_symbol("wumpus", x, y))
+                del self.wumpus_cells[(x, y)]
+        if self.kb is not None:
+            self.kb.retract(*stale)
+
     def reset_kb(self):
-        self.kb = None
-        self.processed_cells.clear()
         print("Resetting KB and wumpus-related knowledge")
         self.knowledge.reset_wumpus_knowledge()
+        self._retract_stale_wumpus_layers()
+        if self.memo is not None:
+            self.memo.clear() # Cell statuses were reset, every cell is classified again
 
     def reset_kb_after_shoot(self, agent_pos: Tuple[int, int], agent_direction: Direction):
-        self.kb = None
-        self.processed_cells.clear()
         print("Resetting KB after shooting")
-        self.knowledge.reset_wumpus_knowledge_after_shoot(agent_pos, agent_direction)
\ No newline at end of file
+        self.knowledge.reset_wumpus_knowledge_after_shoot(agent_pos, agent_direction)
+        self._retract_stale_wumpus_layers()
+        if self.memo is not None:
+            self.memo.clear()
\ No newline at end of file
@@ -0,0 +1,174 @@
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+IntClause = Tuple[int, ...]
+ClauseSet = FrozenSet[IntClause]
+
+
+class WeightedModelCounter:
+    """
+    Weighted model counting (#SAT) over int-encoded clauses.
+    weights maps a variable to (weight if true, weight if false); a variable
+    without an entry weighs (1, 1), so it is simply counted. With prior
+    probabilities as weights, (p, 1 - p), the count of F is the probability of F
+    under independent priors, and conditioning on a literal gives marginals.
+
+    The counter propagates units, splits the residual clauses into variable-
+    disjoint components whose counts multiply, and branches on the most frequent
+    variable otherwise. Component counts are cached by their exact clause set,
+    so the many conditioned counts of marginals() share the untouched components.
+    """
+    def __init__(self, weights: Optional[Dict[int, Tuple[float, float]]] = None):
+        self.weights: Dict[int, Tuple[float, float]] = dict(weights or {})
+        self.cache: Dict[ClauseSet, float] = {}
+        self.cache_hits = 0
+        self.decisions = 0
+
+    def _weight(self, lit: int) -> float:
+        w_true, w_false = self.weights.get(abs(lit), (1.0, 1.0))
+        return w_true if lit > 0 else w_false
+
+    def _free(self, var: int) -> float:
+        w_true, w_false = self.weights.get(var, (1.0, 1.0))
+        return w_true + w_false
+
+    @staticmethod
+    def _vars(clauses: Iterable[IntClause]) -> Set[int]:
+        return set(abs(lit) for clause in clauses for lit in clause)
+
+    def count(self, clauses: Iterable[Sequence[int]], assumptions: Sequence[int] = ()) -> float:
+        """Weighted count of the models of clauses AND assumptions, over the variables of clauses."""
+        clause_set = frozenset(tuple(sorted(set(clause))) for clause in clauses)
+        return self._condition(clause_set, assumptions)
+
+    def marginals(self, clauses: Iterable[Sequence[int]],
+                  queries: Sequence[Sequence[int]]) -> Tuple[float, List[Optional[float]]]:
+        """
+        Return the total weight Z of the clauses and, for every query (a
+        conjunction of literals), P(query | clauses). Query variables that do not
+        occur in the clauses keep their prior. Probabilities are None if Z is 0.
+        """
+        clause_set = frozenset(tuple(sorted(set(clause))) for clause in clauses)
+        total = self._count(clause_set)
+        if total == 0.0:
+            return total, [None] * len(queries)
+        # Components are independent, so a query only needs to condition the ones it touches
+        components = self._components(clause_set)
+        component_of: Dict[int, int] = {}
+        for i, component in enumerate(components):
+            for var in self._vars(component):
+                component_of[var] = i
+        result: List[Optional[float]] = []
+        for query in queries:
+            lits = set(query)
+            if any(-lit in lits for lit in lits):
+                result.append(0.0)
+                continue
+            by_component: Dict[int, List[int]] = {}
+            probability = 1.0
+            for lit in lits:
+                i = component_of.get(abs(lit))
+                if i is None:
+                    probability *= self._weight(lit) / self._free(abs(lit))
+                else:
+                    by_component.setdefault(i, []).append(lit)
+            for i, inside in by_component.items():
+                probability *= self._assign(components[i], inside) / self._count(components[i])
+            result.append(probability)
+        return total, result
+
+    def _condition(self, clauses: ClauseSet, lits: Sequence[int]) -> float:
+        """Weight of clauses AND lits; literals of absent variables weigh in with their prior."""
+        lits = set(lits)
+        if any(-lit in lits for lit in lits):
+            return 0.0
+        weight = 1.0
+        present = self._vars(clauses)
+        for lit in lits:
+            if abs(lit) not in present:
+                weight *= self._weight(lit) / self._free(abs(lit))
+        inside = [lit for lit in lits if abs(lit) in present]
+        if not inside:
+            return weight * self._count(clauses)
+        return weight * self._assign(clauses, inside)
+
+    def _assign(self, clauses: ClauseSet, lits: Sequence[int]) -> float:
+        """Weight of clauses with lits set true: weight of the lits, times the reduced count and freed variables."""
+        assigned = set(lits)
+        if any(-lit in assigned for lit in assigned):
+            return 0.0
+        weight = 1.0
+        for lit in assigned:
+            weight *= self._weight(lit)
+        reduced = set()
+        for clause in clauses:
+            if any(lit in assigned for lit in clause):
+                continue
+            rest = tuple(lit for lit in clause if -lit not in assigned)
+            if not rest:
+                return 0.0
+            reduced.add(rest)
+        # Variables that vanished with the satisfied clauses are free
+        for var in self._vars(clauses) - self._vars(reduced) - set(abs(lit) for lit in assigned):
+            weight *= self._free(var)
+        return weight * self._count(frozenset(reduced))
+
+    def _count(self, clauses: ClauseSet) -> float:
+        """Weighted count over exactly the variables of clauses."""
+        if not clauses:
+            return 1.0
+        cached = self.cache.get(clauses)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+
+        # Unit propagation: assign every unit at once (the rest is reduced by _assign)
+        units = [clause[0] for clause in clauses if len(clause) == 1]
+        if units:
+            result = self._assign(clauses, units)
+            self.cache[clauses] = result
+            return result
+
+        components = self._components(clauses)
+        if len(components) > 1:
+            result = 1.0
+            for component in components:
+                result *= self._count(component)
+                if result == 0.0:
+                    break
+            self.cache[clauses] = result
+            return result
+
+        # Branch on the variable with the most occurrences
+        occurrences: Dict[int, int] = {}
+        for clause in clauses:
+            for lit in clause:
+                occurrences[abs(lit)] = occurrences.get(abs(lit), 0) + 1
+        var = max(occurrences, key=occurrences.get)
+        self.decisions += 1
+        result = self._assign(clauses, (var,)) + self._assign(clauses, (-var,))
+        self.cache[clauses] = result
+        return result
+
+    @staticmethod
+    def _components(clauses: ClauseSet) -> List[ClauseSet]:
+        """Split clauses into groups that share no variable (union-find over variables)."""
+        parent: Dict[int, int] = {}
+
+        def find(var: int) -> int:
+            root = var
+            while parent.get(root, root) != root:
+                root = parent[root]
+            while parent.get(var, var) != root:
+                parent[var], var = root, parent[var]
+            return root
+
+        for clause in clauses:
+            first = find(abs(clause[0]))
+            for lit in clause[1:]:
+                other = find(abs(lit))
+                if other != first:
+                    parent[other] = first
+        groups: Dict[int, List[IntClause]] = {}
+        for clause in clauses:
+            groups.setdefault(find(abs(clause[0])), []).append(clause)
+        return [frozenset(group) for group in groups.values()]
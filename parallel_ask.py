@@ -0,0 +1,196 @@
+import multiprocessing as mp
+import os
+import weakref
+from array import array
+from typing import Dict, List, Optional, Set, Tuple
+
+from cell_symbols import symbol_cell
+from inference import KnowledgeBase, Literal
+from search_budget import SearchBudget
+from solver_stats import SolverStats
+
+# The part of a KB a worker is missing: (solver, heuristic and instrument flag of a new KB, or None to
+# extend its copy, symbol names added since, literals and offsets of the clauses added since)
+KBDelta = Tuple[Optional[Tuple[str, str, bool]], List[str], bytes, bytes]
+
+# What a worker's copy holds: ((KB serial, retractions), symbols sent, clauses sent)
+KBState = Tuple[Tuple[int, int], int, int]
+
+
+def _apply(kb: Optional[KnowledgeBase], delta: KBDelta) -> KnowledgeBase:
+    """Bring the worker's copy of the KB up to date: a new KB is started, a known one only gets the new clauses."""
+    fresh, names, literals, offsets = delta
+    if fresh is not None:
+        solver, heuristic, instrument = fresh
+        kb = KnowledgeBase(solver, heuristic=heuristic, instrument=instrument)
+    for name in names:
+        kb.symbols.intern(name) # Same ids as in the parent
+    lits = array('i')
+    lits.frombytes(literals)
+    offs = array('i')
+    offs.frombytes(offsets)
+    for i in range(len(offs) - 1):
+        kb.tell(kb.symbols.decode_clause(lits[offs[i] - offs[0]:offs[i + 1] - offs[0]]))
+    return kb
+
+
+def _serve(conn):
+    """Worker process: keep one KB copy and answer the chunks of queries it receives, with their search counters."""
+    kb: Optional[KnowledgeBase] = None
+    while True:
+        task = conn.recv()
+        if task is None:
+            return
+        delta, chunk, budget = task
+        kb = _apply(kb, delta)
+        entailed = kb.ask_many(chunk, budget)
+        conn.send((entailed, kb.unknown, kb.pop_stats() if kb.instrument else None))
+
+
+class ParallelAsker:
+    """
+    Opt-in executor for KnowledgeBase.ask_many: the queries that still need a
+    search are split into one chunk per worker process, keeping the four
+    queries of a cell together so the worker's models refute them as a batch.
+    Each worker keeps its own copy of the KB, and the parent remembers how much
+    of it every worker has seen: a chunk only carries the symbols and clauses
+    added since that worker's last chunk. A new KB or a retraction (which
+    rebuilds the arena) sends the KB again from the start. A worker that fails
+    (it died, or could not rebuild the KB) is restarted, and its chunk goes back
+    to the caller to be solved serially.
+    Batches with fewer than min_parallel pending queries are solved serially,
+    since shipping the KB would cost more than the searches.
+    """
+    def __init__(self, workers: Optional[int] = None, min_parallel: int = 16):
+        self.workers = workers or os.cpu_count() or 1
+        self.min_parallel = min_parallel
+        self.dispatches = 0 # Batches fanned out to the workers
+        self.serial_batches = 0 # Batches too small to be worth it
+        self.clauses_sent = 0 # Clauses shipped to workers, over all dispatches
+        self.worker_failures = 0 # Chunks handed back because their worker failed
+        self._serials: "weakref.WeakKeyDictionary[KnowledgeBase, int]" = weakref.WeakKeyDictionary()
+        self._next_serial = 0
+        self._pipes = []
+        self._processes = []
+        self._sent: List[Optional[KBState]] = [] # Per worker: what its KB copy already holds
+
+    def should_dispatch(self, num_pending: int) -> bool:
+        if num_pending >= self.min_parallel and self.workers > 1:
+            return True
+        self.serial_batches += 1
+        return False
+
+    def _start(self):
+        for _ in range(self.workers):
+            self._pipes.append(None)
+            self._processes.append(None)
+            self._sent.append(None)
+            self._spawn(len(self._processes) - 1)
+
+    def _spawn(self, worker: int):
+        ctx = mp.get_context()
+        parent_end, worker_end = ctx.Pipe()
+        process = ctx.Process(target=_serve, args=(worker_end,), daemon=True)
+        process.start()
+        self._pipes[worker] = parent_end
+        self._processes[worker] = process
+        self._sent[worker] = None
+
+    def _restart(self, worker: int):
+        """Replace a failed worker; its KB copy is gone, so the next chunk sends the KB again."""
+        self.worker_failures += 1
+        self._pipes[worker].close()
+        if self._processes[worker].is_alive():
+            self._processes[worker].terminate()
+        self._processes[worker].join(timeout=1.0)
+        self._spawn(worker)
+
+    def _token(self, kb: KnowledgeBase) -> Tuple[int, int]:
+        if kb not in self._serials:
+            self._next_serial += 1
+            self._serials[kb] = self._next_serial
+        return self._serials[kb], kb.retractions # Between retractions the arena only grows
+
+    def delta(self, kb: KnowledgeBase, worker: int) -> KBDelta:
+        """What worker is missing of kb, and mark it as sent."""
+        token = self._token(kb)
+        sent = self._sent[worker]
+        fresh = None
+        symbols_sent, clauses_sent = 0, 0
+        if sent is None or sent[0] != token:
+            fresh = (kb.solver, kb.heuristic, kb.instrument)
+        else:
+            _, symbols_sent, clauses_sent = sent
+        names = kb.symbols.names()
+        arena = kb.arena
+        num_clauses = len(arena)
+        start, end = arena.offsets[clauses_sent], arena.offsets[num_clauses]
+        self._sent[worker] = (token, len(names), num_clauses)
+        self.clauses_sent += num_clauses - clauses_sent
+        return (fresh, names[symbols_sent:], arena.literals[start:end].tobytes(),
+                arena.offsets[clauses_sent:num_clauses + 1].tobytes())
+
+    def chunks(self, queries: List[Literal]) -> List[List[Literal]]:
+        """One chunk per worker, dealing whole cells round robin (other symbols go one by one)."""
+        groups: Dict[object, List[Literal]] = {}
+        for lit in queries:
+            symbol = lit[0]
+            groups.setdefault(symbol_cell(symbol) or symbol, []).append(lit)
+        chunks: List[List[Literal]] = [[] for _ in range(self.workers)]
+        for i, group in enumerate(groups.values()):
+            chunks[i % self.workers].extend(group)
+        return chunks
+
+    def ask_many(self, kb: KnowledgeBase, queries: List[Literal], budget: Optional[SearchBudget] = None
+                 ) -> Tuple[Set[Literal], Set[Literal], List[Literal], Optional[SolverStats]]:
+        """
+        Solve queries across the workers: (entailed, unknown, failed, stats). failed holds
+        the queries of workers that failed, for the caller to solve itself; stats sums the
+        workers' search counters if kb is instrumented.
+        """
+        if not self._processes:
+            self._start()
+        self.dispatches += 1
+        chunks = self.chunks(queries)
+        busy = []
+        failed: List[Literal] = []
+        for worker, chunk in enumerate(chunks):
+            if not chunk:
+                continue
+            try:
+                self._pipes[worker].send((self.delta(kb, worker), chunk, budget))
+                busy.append(worker)
+            except (BrokenPipeError, OSError):
+                self._restart(worker)
+                failed.extend(chunk)
+        entailed: Set[Literal] = set()
+        unknown: Set[Literal] = set()
+        stats = SolverStats() if kb.instrument else None
+        for worker in busy:
+            try:
+                chunk_entailed, chunk_unknown, chunk_stats = self._pipes[worker].recv()
+            except (EOFError, OSError):
+                self._restart(worker)
+                failed.extend(chunks[worker])
+                continue
+            entailed |= chunk_entailed
+            unknown |= chunk_unknown
+            if stats is not None and chunk_stats is not None:
+                stats.add(chunk_stats)
+        return entailed, unknown, failed, stats
+
+    def stats(self) -> Dict[str, int]:
+        return {"workers": self.workers, "dispatches": self.dispatches, "serial_batches": self.serial_batches,
+                "clauses_sent": self.clauses_sent, "worker_failures": self.worker_failures}
+
+    def close(self):
+        for pipe in self._pipes:
+            try:
+                pipe.send(None)
+            except (BrokenPipeError, OSError):
+                pass # Already gone
+        for process in self._processes:
+            process.join(timeout=1.0)
+            if process.is_alive():
+                process.terminate()
+        self._pipes, self._processes, self._sent = [], [], []
@@ -11,6 +11,8 @@ class Planner:
     def __init__(self, grid_size: int, knowledge: MapKnowledge):
         self.grid_size = grid_size
         self.map_knowledge = knowledge
+        # Optional exact risk per cell (e.g. InferenceEngine.cell_probabilities), used instead of the estimate
+        self.risk_probabilities: Optional[Dict[Tuple[int, int], float]] = None
 
     def _heuristic(self, pos: Tuple[int, int], goal: Tuple[int, int]) -> int:
         """Manhattan distance heuristic"""
@@ -32,6 +34,8 @@ class Planner:
         cell = self.map_knowledge.get_cell(x, y)
         if cell.status != CellStatus.UNKNOWN:
             return 0.0
+        if self.risk_probabilities is not None and (x, y) in self.risk_probabilities:
+            return self.risk_probabilities[(x, y)]
         neighbors = self.map_knowledge.get_neighbors(x, y)
         risk = 0.0
         for nx, ny in neighbors:
@@ -0,0 +1,90 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+from cell_symbols import Cell, symbol_cell
+from inference import IntClause, KnowledgeBase
+
+
+class CellClauseIndex:
+    """
+    Spatial index of a KB: cell -> arena clauses with a symbol of that cell.
+    slice() collects the clauses within a few hops of the query cells, where a
+    hop follows a clause from one of its cells to the others, and the boundary:
+    the slice variables that clauses outside the slice also mention.
+    KnowledgeBase(slicer=...) tries the slice before the full search. Any subset
+    of the KB is sound for entailment (UNSAT on the slice means UNSAT on the KB).
+    A model of the slice that agrees with a known model of the KB on the boundary
+    combines with it into a model of the KB, which proves non-entailment. When
+    neither holds, the ask falls back to the full KB.
+    The index follows the arena of the KB it is called with: new clauses are
+    indexed on the next slice, and a retraction (which rebuilds the arena) or
+    another KB rebuilds the index.
+    """
+    def __init__(self, radius: int = 2):
+        self.radius = radius
+        self.cell_clauses: Dict[Cell, List[int]] = {} # cell -> arena indices
+        self._kb: Optional[KnowledgeBase] = None
+        self._indexed = 0 # Arena prefix already indexed
+        self._retractions = 0
+        self.slices = 0
+        self.closed = 0 # Neighbourhoods that closed within the radius (no slice needed)
+
+    def _cell_of(self, var: int) -> Optional[Cell]:
+        return symbol_cell(self._kb.symbols.name(var))
+
+    def _sync(self, kb: KnowledgeBase):
+        if self._kb is not kb:
+            self._kb = kb
+            self._retractions = -1
+        if self._retractions != kb.retractions:
+            self._retractions = kb.retractions
+            self.cell_clauses.clear()
+            self._indexed = 0
+        arena = kb.arena
+        for index in range(self._indexed, len(arena)):
+            for cell in set(self._cell_of(abs(lit)) for lit in arena[index]):
+                if cell is not None:
+                    self.cell_clauses.setdefault(cell, []).append(index)
+        self._indexed = len(arena)
+
+    def slice(self, kb: KnowledgeBase, query_key: IntClause) -> Optional[Tuple[List[IntClause], Set[int]]]:
+        """
+        (KB clauses within radius hops of the query's cells, boundary variables),
+        or None when the neighbourhood closes before the radius: then the KB's own
+        component split already limits the search to it.
+        """
+        self._sync(kb)
+        arena = kb.arena
+        frontier: Set[Cell] = set(cell for cell in (self._cell_of(abs(lit)) for lit in query_key) if cell is not None)
+        reached = set(frontier)
+        indices: Set[int] = set()
+        for _ in range(self.radius):
+            next_frontier: Set[Cell] = set()
+            for cell in frontier:
+                for index in self.cell_clauses.get(cell, ()):
+                    if index in indices:
+                        continue
+                    indices.add(index)
+                    for lit in arena[index]:
+                        other = self._cell_of(abs(lit))
+                        if other is not None and other not in reached:
+                            reached.add(other)
+                            next_frontier.add(other)
+            frontier = next_frontier
+            if not frontier:
+                self.closed += 1
+                return None
+        self.slices += 1
+        clauses = [arena[index] for index in indices]
+        inside = set(abs(lit) for clause in clauses for lit in clause)
+        # Clauses of the unexpanded cells are the only ones outside the slice that can share a variable
+        # with it (every variable belongs to a cell); variables without a cell are kept as boundary too
+        boundary = set(var for var in inside if self._cell_of(var) is None)
+        for cell in frontier:
+            for index in self.cell_clauses.get(cell, ()):
+                if index not in indices:
+                    boundary.update(var for var in (abs(lit) for lit in arena[index]) if var in inside)
+        return clauses, boundary
+
+    def stats(self) -> Dict[str, int]:
+        return {"radius": self.radius, "slices": self.slices, "closed": self.closed,
+                "indexed_cells": len(self.cell_clauses)}
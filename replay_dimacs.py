@@ -0,0 +1,57 @@
+import argparse
+import glob
+import json
+import os
+import time
+from typing import Dict, List
+
+from dimacs import read_dimacs, read_symbol_map, sidecar_path
+from inference import SAT_ENGINES
+from solver_portfolio import SolverPortfolio
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded entailment problems (DIMACS) against the SAT engines.")
+    parser.add_argument("directory", help="directory written with --record (searched recursively for *.cnf)")
+    parser.add_argument("--engines", nargs="*", default=["dpll", "iterative", "cdcl"],
+                        help=f"engines to run, from {tuple(SAT_ENGINES) + ('portfolio',)}")
+    parser.add_argument("--output", default=None, help="optional JSON file for the results")
+    args = parser.parse_args()
+    portfolio = None
+    if "portfolio" in args.engines:
+        portfolio = SolverPortfolio()
+        portfolio.register()
+
+    paths = sorted(glob.glob(os.path.join(args.directory, "**", "*.cnf"), recursive=True))
+    problems = []
+    for path in paths:
+        _, clauses = read_dimacs(path)
+        expected = read_symbol_map(path).get("expected") if os.path.exists(sidecar_path(path)) else None
+        problems.append((path, clauses, expected))
+    print(f"Loaded {len(problems)} problems from {args.directory} "
+          f"(avg {sum(len(c) for _, c, _ in problems) / max(1, len(problems)):.1f} clauses)")
+
+    results: Dict[str, Dict] = {}
+    for name in args.engines:
+        engine = SAT_ENGINES[name]
+        mismatches: List[str] = []
+        unsat = 0
+        start = time.perf_counter()
+        for path, clauses, expected in problems:
+            verdict = "SAT" if engine(clauses) is not None else "UNSAT"
+            unsat += verdict == "UNSAT"
+            if expected in ("SAT", "UNSAT") and verdict != expected:
+                mismatches.append(path)
+        elapsed = time.perf_counter() - start
+        results[name] = {"time_s": round(elapsed, 4), "unsat": unsat, "mismatches": mismatches}
+        print(f"{name:>10}: {elapsed * 1000:10.1f} ms  {unsat} entailed  {len(mismatches)} mismatches")
+        for path in mismatches[:10]:
+            print(f"    mismatch: {path}")
+
+    if portfolio is not None:
+        results["portfolio"]["portfolio_stats"] = portfolio.stats()
+        print(f"portfolio: {portfolio.stats()}")
+        portfolio.close()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=4)
@@ -1,12 +1,20 @@
+import argparse
 import json
 import csv
+import os
 from hybrid_agent import HybridAgent
 from random_agent import RandomAgent
 from inference import KnowledgeBase
+from solver_stats import SolverStats
+from search_budget import SearchBudget
+from dimacs import ProblemRecorder
+from entailment_store import PersistentEntailmentCache
 from typing import List, Set, Tuple, FrozenSet
 from environment import Environment, Action
 import time
 
+SOLVER_STAT_FIELDS = SolverStats.FIELDS + ("inferences", "max_inference_time_s", "skipped_asks")
+STEP_BUDGET_S = 2.0 # Search time ceiling of one inference step
 
 def create_env(config):
     return Environment(size=config['Size'], num_wumpus=config['NumWumpus'], pit_prob=config['PitProb'], moving_wumpus_mode=config['Moving'])
@@ -26,6 +34,7 @@ def run_test(env, agent):
     agent.run()
     
     end_time = time.time()
+    solver_stats = agent.solver_stats() if hasattr(agent, "solver_stats") else {}
     
     if env.agent_state.has_gold and env.agent_state.win:
         successes += 1
@@ -35,10 +44,20 @@ def run_test(env, agent):
     total_time += (end_time - start_time)
     total_step += env.agent_action_count
 
-    return successes, total_score, total_time, total_step
+    return successes, total_score, total_time, total_step, solver_stats
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the hybrid agent with the random agent on random maps.")
+    parser.add_argument("--record", default=None,
+                        help="directory to record the hybrid agent's entailment problems in, as DIMACS (one subdirectory per map)")
+    parser.add_argument("--persistent-cache", nargs="?", const="results/entailment_cache.sqlite", default=None,
+                        help="reuse entailment verdicts across runs from this SQLite file")
+    parser.add_argument("--no-memo", action="store_true",
+                        help="ask about every neighbour at every inference step instead of skipping settled cells")
+    args = parser.parse_args()
+    persistent_cache = PersistentEntailmentCache(args.persistent_cache) if args.persistent_cache else None
+
     with open('map/map.json', 'r') as f:
         config = json.load(f)
 
@@ -65,7 +84,7 @@ if __name__ == "__main__":
         'Map_ID', 'Size', 'NumWumpus', 'PitProb', 'Moving',
         'Hybrid_Success', 'Hybrid_Score', 'Hybrid_Decision_Eff', 'Hybrid_Time_ms',
         'Random_Success', 'Random_Score', 'Random_Decision_Eff', 'Random_Time_ms'
-    ]
+    ] + [f'Hybrid_Solver_{field}' for field in SOLVER_STAT_FIELDS]
     
     all_hybrid_successes = []
     all_hybrid_scores = []
@@ -84,9 +103,13 @@ if __name__ == "__main__":
 
             print(f"Running test {i+1}/{len(envs)}: {env_config}")
             
-            hybrid_success, hybrid_score, hybrid_time, hybrid_steps = run_test(env, HybridAgent)
+            recorder = ProblemRecorder(os.path.join(args.record, f"map{i + 1}")) if args.record else None
+            hybrid_success, hybrid_score, hybrid_time, hybrid_steps, hybrid_stats = run_test(
+                env, lambda e: HybridAgent(e, instrument=True, budget=SearchBudget(max_time_s=STEP_BUDGET_S),
+                                           recorder=recorder, persistent_cache=persistent_cache,
+                                           memoize=not args.no_memo))
             
-            random_success, random_score, random_time, random_steps = run_test(env, RandomAgent)
+            random_success, random_score, random_time, random_steps, _ = run_test(env, RandomAgent)
             
             all_hybrid_successes.append(hybrid_success)
             all_hybrid_scores.append(hybrid_score)
@@ -111,7 +134,7 @@ if __name__ == "__main__":
                 random_score,
                 random_steps,
                 round(random_time * 1000, 6)        # Time taken in milliseconds (rounded to 6 decimal places)
-            ]
+            ] + [hybrid_stats.get(field, 0) for field in SOLVER_STAT_FIELDS]
             writer.writerow(row)
     
     print(f"Individual test results saved to '{csv_filename}'")
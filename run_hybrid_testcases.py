@@ -1,10 +1,14 @@
+import argparse
 import json
 import csv
+import os
 from hybrid_agent import HybridAgent
 from random_agent import RandomAgent
 from inference import KnowledgeBase
 from typing import List, Set, Tuple, FrozenSet
 from environment import Environment, Action
+from dimacs import ProblemRecorder
+from entailment_store import PersistentEntailmentCache
 import time
 
 
@@ -69,6 +73,13 @@ def run_test(env: Environment, agent_class) -> Tuple[int, int, float, int]:
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the hybrid agent on testcases/map*.json.")
+    parser.add_argument("--record", default=None,
+                        help="directory to record every entailment problem in, as DIMACS (one subdirectory per map)")
+    parser.add_argument("--persistent-cache", nargs="?", const="results/entailment_cache.sqlite", default=None,
+                        help="reuse entailment verdicts across runs from this SQLite file")
+    args = parser.parse_args()
+    persistent_cache = PersistentEntailmentCache(args.persistent_cache) if args.persistent_cache else None
 
     num_env = 5 # Change this when adding more test cases
     envs = []
@@ -99,7 +110,9 @@ if __name__ == "__main__":
 
         for i, env in enumerate(envs):
             #env.display()
-            successes, total_score, total_time, total_step, log_act, final_map_state = run_test(env, HybridAgent)
+            recorder = ProblemRecorder(os.path.join(args.record, f"map{i + 1}")) if args.record else None
+            agent_class = lambda e: HybridAgent(e, recorder=recorder, persistent_cache=persistent_cache)
+            successes, total_score, total_time, total_step, log_act, final_map_state = run_test(env, agent_class)
 
             all_hybrid_successes.append(successes)
             all_hybrid_scores.append(total_score)
@@ -0,0 +1,41 @@
+import time
+from typing import Optional
+
+
+class BudgetExhausted(Exception):
+    """Raised by a solver when the SearchBudget of the current ask runs out."""
+    pass
+
+
+class SearchBudget:
+    """
+    Limits on the search work of one ask (or one ask_many batch): decisions,
+    unit propagations and wall time. Any limit left as None is unbounded.
+    Solvers charge their work at decision points, so the check costs nothing
+    between decisions and the time limit is enforced at that granularity.
+    """
+    def __init__(self, max_decisions: Optional[int] = None, max_propagations: Optional[int] = None,
+                 max_time_s: Optional[float] = None):
+        self.max_decisions = max_decisions
+        self.max_propagations = max_propagations
+        self.max_time_s = max_time_s
+        self.decisions = 0
+        self.propagations = 0
+        self.deadline: Optional[float] = None
+
+    def start(self):
+        """Reset the spent work and start the clock."""
+        self.decisions = 0
+        self.propagations = 0
+        self.deadline = time.perf_counter() + self.max_time_s if self.max_time_s is not None else None
+
+    def charge(self, decisions: int = 0, propagations: int = 0):
+        """Add work done since the last charge. Raises BudgetExhausted if a limit is exceeded."""
+        self.decisions += decisions
+        self.propagations += propagations
+        if self.max_decisions is not None and self.decisions > self.max_decisions:
+            raise BudgetExhausted("decision budget exhausted")
+        if self.max_propagations is not None and self.propagations > self.max_propagations:
+            raise BudgetExhausted("propagation budget exhausted")
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise BudgetExhausted("time budget exhausted")
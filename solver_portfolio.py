@@ -0,0 +1,148 @@
+import multiprocessing as mp
+import queue
+import time
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from inference import SAT_ENGINES, IntClause, register_engine
+from search_budget import BudgetExhausted, SearchBudget
+from solver_stats import SolverStats
+
+Config = Tuple[str, str] # (engine name in SAT_ENGINES, branching heuristic)
+
+DEFAULT_CONFIGS: List[Config] = [("iterative", "first"), ("iterative", "vsids"), ("iterative", "jw"), ("cdcl", "first")]
+
+
+def config_name(config: Config) -> str:
+    engine, heuristic = config
+    return engine if engine != "iterative" or heuristic == "first" else f"{engine}-{heuristic}"
+
+
+class RaceBudget(SearchBudget):
+    """Budget of one racer: the caller's limits, plus cancellation once another racer has won."""
+    def __init__(self, current, task_id: int, max_decisions: Optional[int], max_propagations: Optional[int],
+                 max_time_s: Optional[float]):
+        super().__init__(max_decisions, max_propagations, max_time_s)
+        self.current = current # Shared id of the task the parent still waits for
+        self.task_id = task_id
+
+    def charge(self, decisions: int = 0, propagations: int = 0):
+        if self.current.value != self.task_id:
+            raise BudgetExhausted("another configuration answered first")
+        super().charge(decisions, propagations)
+
+
+def _racer(config: Config, tasks, results, current):
+    """Worker process: solve every task it receives with one configuration."""
+    engine, heuristic = config
+    name = config_name(config)
+    while True:
+        task = tasks.recv()
+        if task is None:
+            return
+        task_id, clauses, limits = task
+        if current.value != task_id:
+            results.put((task_id, name, False, None, None)) # Already decided, skip it
+            continue
+        budget = RaceBudget(current, task_id, *limits)
+        budget.start()
+        stats = SolverStats()
+        try:
+            model = SAT_ENGINES[engine](clauses, stats, budget, heuristic=heuristic)
+        except BudgetExhausted:
+            results.put((task_id, name, False, None, None))
+            continue
+        results.put((task_id, name, True, model, stats))
+
+
+class SolverPortfolio:
+    """
+    SAT engine that races several engine/heuristic configurations in worker
+    processes and takes the first answer. The losers are cancelled through a
+    shared task id that their RaceBudget checks at every decision, so they drop
+    the stale problem and are ready for the next one.
+    Problems with fewer than min_race_clauses clauses are solved in-process by
+    the first configuration, where starting a race would cost more than it saves.
+    `wins` counts, per configuration, the races it answered first.
+
+    Register it (register() or inference.register_engine) and use
+    KnowledgeBase(solver="portfolio").
+    """
+    def __init__(self, configs: Sequence[Config] = DEFAULT_CONFIGS, min_race_clauses: int = 64):
+        self.configs = list(configs)
+        self.min_race_clauses = min_race_clauses
+        self.wins: Dict[str, int] = {config_name(config): 0 for config in self.configs}
+        self.races = 0
+        self.inline = 0 # Problems too small to race
+        self._task_id = 0
+        self._current = None
+        self._results = None
+        self._pipes = []
+        self._workers = []
+
+    def register(self, name: str = "portfolio"):
+        register_engine(name, self)
+
+    def _start(self):
+        ctx = mp.get_context()
+        self._current = ctx.RawValue('i', 0)
+        self._results = ctx.Queue()
+        for config in self.configs:
+            receiver, sender = ctx.Pipe(duplex=False)
+            worker = ctx.Process(target=_racer, args=(config, receiver, self._results, self._current), daemon=True)
+            worker.start()
+            self._pipes.append(sender)
+            self._workers.append(worker)
+
+    def __call__(self, clauses: List[IntClause], stats: Optional[SolverStats] = None,
+                 budget: Optional[SearchBudget] = None, **options) -> Optional[Set[int]]:
+        if len(clauses) < self.min_race_clauses:
+            self.inline += 1
+            engine, heuristic = self.configs[0]
+            return SAT_ENGINES[engine](clauses, stats, budget, heuristic=heuristic)
+        if not self._workers:
+            self._start()
+
+        self.races += 1
+        self._task_id += 1
+        task_id = self._task_id
+        limits = (budget.max_decisions, budget.max_propagations, budget.max_time_s) if budget else (None, None, None)
+        self._current.value = task_id
+        clauses = list(clauses)
+        for pipe in self._pipes:
+            pipe.send((task_id, clauses, limits))
+
+        deadline = budget.deadline if budget is not None else None
+        answered = 0
+        try:
+            while answered < len(self.configs):
+                timeout = None if deadline is None else max(0.0, deadline - time.perf_counter())
+                try:
+                    reply_id, name, done, model, racer_stats = self._results.get(timeout=timeout)
+                except queue.Empty:
+                    raise BudgetExhausted("time budget exhausted")
+                if reply_id != task_id:
+                    continue # Late reply to an earlier race
+                answered += 1
+                if done:
+                    self.wins[name] += 1
+                    if stats is not None:
+                        stats.add(racer_stats)
+                    return model
+            raise BudgetExhausted("every configuration ran out of budget")
+        finally:
+            self._current.value = -task_id # Cancel the racers still running
+
+    def stats(self) -> Dict[str, object]:
+        return {"races": self.races, "inline": self.inline, "wins": dict(self.wins)}
+
+    def close(self):
+        for pipe in self._pipes:
+            try:
+                pipe.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for worker in self._workers:
+            worker.join(timeout=1.0)
+            if worker.is_alive():
+                worker.terminate()
+        self._pipes, self._workers = [], []
@@ -0,0 +1,64 @@
+import time
+from typing import Dict, Optional, Tuple
+
+
+class SolverStats:
+    """
+    Search counters of one or more asks: recursion (or decision) depth, decisions,
+    unit propagations, pure-literal eliminations, conflicts, clauses scanned and
+    wall time. Instances add up, so the same type serves per ask, per
+    run_inference call and per episode.
+    """
+    FIELDS = ("asks", "searches", "max_depth", "decisions", "propagations",
+              "pure_literals", "conflicts", "clauses_scanned", "time_s", "budget_exhausted")
+    __slots__ = FIELDS + ("_start",)
+
+    def __init__(self):
+        self.asks = 0 # ask() calls, including the ones answered from caches
+        self.searches = 0 # Calls into a SAT engine
+        self.max_depth = 0
+        self.decisions = 0
+        self.propagations = 0
+        self.pure_literals = 0
+        self.conflicts = 0
+        self.clauses_scanned = 0
+        self.time_s = 0.0
+        self.budget_exhausted = 0 # Asks left unknown because their SearchBudget ran out
+        self._start: Optional[float] = None
+
+    def start(self):
+        self._start = time.perf_counter()
+
+    def stop(self):
+        if self._start is not None:
+            self.time_s += time.perf_counter() - self._start
+            self._start = None
+
+    def add(self, other: "SolverStats"):
+        """Accumulate another set of counters into this one (depth is a maximum)."""
+        for field in self.FIELDS:
+            if field == "max_depth":
+                self.max_depth = max(self.max_depth, other.max_depth)
+            else:
+                setattr(self, field, getattr(self, field) + getattr(other, field))
+
+    @staticmethod
+    def snapshot(solver) -> Tuple[int, int, int, int]:
+        """Cumulative counters of an IterativeDPLL or CDCLSolver, for add_solver(since=...)."""
+        return solver.decisions, solver.propagations, solver.conflicts, solver.clauses_scanned
+
+    def add_solver(self, solver, since: Tuple[int, int, int, int] = (0, 0, 0, 0)):
+        """Accumulate the counters of an IterativeDPLL or CDCLSolver run since a snapshot."""
+        decisions, propagations, conflicts, scanned = self.snapshot(solver)
+        self.searches += 1
+        self.max_depth = max(self.max_depth, solver.max_depth)
+        self.decisions += decisions - since[0]
+        self.propagations += propagations - since[1]
+        self.conflicts += conflicts - since[2]
+        self.clauses_scanned += scanned - since[3]
+
+    def as_dict(self) -> Dict[str, float]:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def __repr__(self) -> str:
+        return "SolverStats(" + ", ".join(f"{k}={v}" for k, v in self.as_dict().items()) + ")"
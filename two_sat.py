@@ -0,0 +1,78 @@
+from typing import Dict, List, Optional, Sequence, Set
+
+
+def is_two_sat(clauses: Sequence[Sequence[int]]) -> bool:
+    return all(len(clause) <= 2 for clause in clauses)
+
+
+def two_sat_model(clauses: Sequence[Sequence[int]]) -> Optional[Set[int]]:
+    """
+    Solve a CNF whose clauses have at most two literals in linear time.
+    Each clause (a v b) becomes the implications ~a -> b and ~b -> a, and the
+    formula is unsatisfiable iff some x and ~x share a strongly connected
+    component. Returns the true literals of a model, or None.
+    """
+    graph: Dict[int, List[int]] = {}
+    for clause in clauses:
+        if not clause:
+            return None
+        a = clause[0]
+        b = clause[1] if len(clause) > 1 else a # A unit (a) is (a v a)
+        graph.setdefault(-a, []).append(b)
+        graph.setdefault(-b, []).append(a)
+        graph.setdefault(a, [])
+        graph.setdefault(b, [])
+
+    # Tarjan's algorithm, iterative. Components are numbered in reverse
+    # topological order of the condensed implication graph.
+    index: Dict[int, int] = {}
+    lowlink: Dict[int, int] = {}
+    component: Dict[int, int] = {}
+    stack: List[int] = []
+    on_stack: Set[int] = set()
+    counter = 0
+    num_components = 0
+
+    for start in graph:
+        if start in index:
+            continue
+        work = [(start, 0)]
+        while work:
+            node, edge_i = work.pop()
+            if edge_i == 0:
+                index[node] = lowlink[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack.add(node)
+            edges = graph[node]
+            while edge_i < len(edges):
+                succ = edges[edge_i]
+                edge_i += 1
+                if succ not in index:
+                    work.append((node, edge_i))
+                    work.append((succ, 0))
+                    break
+                if succ in on_stack:
+                    lowlink[node] = min(lowlink[node], index[succ])
+            else:
+                if lowlink[node] == index[node]:
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component[member] = num_components
+                        if member == node:
+                            break
+                    num_components += 1
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+    model: Set[int] = set()
+    for lit in graph:
+        if lit < 0:
+            continue
+        if component[lit] == component[-lit]:
+            return None
+        # x is true iff its component comes later in topological order than ~x's
+        model.add(lit if component[lit] < component[-lit] else -lit)
+    return model
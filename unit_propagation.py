@@ -0,0 +1,89 @@
+from typing import Dict, List, Sequence, Set, Tuple
+
+
+class UnitClosure:
+    """
+    Incremental unit-propagation closure of a growing clause set.
+    `implied` holds every literal that follows from the clauses by unit
+    propagation alone. New clauses are propagated with two watched literals,
+    so maintaining the closure over a whole episode is linear in its size.
+    Every implied literal keeps the clause that implied it, so lost_support()
+    can tell which derivations rest on a given set of clauses.
+    """
+    def __init__(self):
+        self.implied: Set[int] = set()
+        self.trail: List[int] = [] # implied, in the order the literals were derived
+        self.conflict = False # True once propagation derives the empty clause
+        self.watches: Dict[int, List[List[int]]] = {} # literal -> clauses watching it
+        self.propagations = 0
+        self.reasons: Dict[int, Tuple[int, ...]] = {} # implied literal -> clause (as added) that implied it
+        self._origin: Dict[int, Tuple[List[int], Tuple[int, ...]]] = {} # id(watched list) -> (it, clause as added)
+
+    def __contains__(self, lit: int) -> bool:
+        return self.conflict or lit in self.implied
+
+    def add_clause(self, clause: Sequence[int]):
+        if self.conflict:
+            return
+        lits = []
+        for lit in clause:
+            if lit in self.implied:
+                return # Satisfied for good: implied literals never become false
+            if -lit not in self.implied:
+                lits.append(lit)
+        if not lits:
+            self.conflict = True
+        elif len(lits) == 1:
+            self._imply(lits[0], tuple(clause))
+        else:
+            self._origin[id(lits)] = (lits, tuple(clause))
+            self.watches.setdefault(lits[0], []).append(lits)
+            self.watches.setdefault(lits[1], []).append(lits)
+
+    def _imply(self, lit: int, reason: Tuple[int, ...]):
+        queue = [lit]
+        self.implied.add(lit)
+        self.trail.append(lit)
+        self.reasons[lit] = reason
+        while queue:
+            false_lit = -queue.pop()
+            for clause in self.watches.pop(false_lit, ()):
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], false_lit
+                if clause[0] in self.implied:
+                    continue # Satisfied, no need to watch it any more
+                for k in range(2, len(clause)):
+                    if -clause[k] not in self.implied:
+                        clause[1], clause[k] = clause[k], false_lit
+                        self.watches.setdefault(clause[1], []).append(clause)
+                        break
+                else:
+                    other = clause[0]
+                    if -other in self.implied:
+                        self.conflict = True
+                        return
+                    self.propagations += 1
+                    self.implied.add(other)
+                    self.trail.append(other)
+                    self.reasons[other] = self._origin[id(clause)][1]
+                    queue.append(other)
+
+    def lost_support(self, removed: Set[Tuple[int, ...]],
+                     sources: Set[Tuple[int, ...]]) -> Tuple[Set[int], Set[int]]:
+        """
+        Split the implied literals by what their unit derivation rests on, with
+        the clauses in removed taken away: (lost, untracked). A lost literal was
+        derived from a removed clause; an untracked one from a clause outside
+        sources. Every other implied literal is still implied by the remaining
+        sources alone, through the same derivation.
+        """
+        lost: Set[int] = set()
+        untracked: Set[int] = set()
+        for lit in self.trail: # A literal's reason only has literals derived before it
+            reason = self.reasons[lit]
+            antecedents = [-other for other in reason if other != lit]
+            if reason not in sources or any(other in untracked for other in antecedents):
+                untracked.add(lit)
+            elif reason in removed or any(other in lost for other in antecedents):
+                lost.add(lit)
+        return lost, untracked
@@ -0,0 +1,66 @@
+from typing import Dict, Iterable, Optional
+
+from cnf_components import ComponentIndex
+from inference import KnowledgeBase
+
+
+class VerdictMemo:
+    """
+    Remembers when run_inference last asked about each symbol, so a cell is only
+    asked about again once a clause that can change its verdicts was told.
+    The told clauses are grouped into components (ComponentIndex over their
+    variables), and every clause stamps its component with its arena position.
+    The verdicts of a literal follow from the clauses of its component alone (as
+    long as the KB is satisfiable, which true percepts guarantee), so a symbol
+    whose component gained no clause since its last query is skipped. A cell's
+    P_ and W_ symbols are tracked apart: a stench clause leaves pit verdicts be.
+    The memo follows the arena of the KB it is called with; a retraction or
+    another KB starts it over, and the caller clears it when the map knowledge
+    is reset.
+    """
+    def __init__(self):
+        self.components = ComponentIndex()
+        self.stamps: Dict[int, int] = {} # root -> arena size after the component's latest clause
+        self.queried: Dict[int, int] = {} # variable -> arena size when it was last asked about
+        self._kb: Optional[KnowledgeBase] = None
+        self._indexed = 0 # Arena prefix already grouped
+        self._retractions = 0
+
+    def clear(self):
+        self.components = ComponentIndex()
+        self.stamps.clear()
+        self.queried.clear()
+        self._indexed = 0
+
+    def _sync(self, kb: KnowledgeBase):
+        if self._kb is not kb or self._retractions != kb.retractions:
+            self._kb = kb
+            self._retractions = kb.retractions
+            self.clear()
+        arena = kb.arena
+        for index in range(self._indexed, len(arena)):
+            clause = arena[index]
+            if not clause:
+                continue
+            for root in self.components.roots_of(clause):
+                self.stamps.pop(root, None) # Merged below, the new root carries the stamp
+            self.components.add_clause(index, clause)
+            self.stamps[self.components.find(abs(clause[0]))] = index + 1
+        self._indexed = len(arena)
+
+    def is_current(self, kb: KnowledgeBase, symbols: Iterable[str]) -> bool:
+        """True if every symbol was asked about since the last clause that reached its component."""
+        self._sync(kb)
+        for symbol in symbols:
+            var = kb.symbols.get(symbol)
+            queried = self.queried.get(var) if var is not None else None
+            if queried is None or self.stamps.get(self.components.find(var), 0) > queried:
+                return False
+        return True
+
+    def record(self, kb: KnowledgeBase, symbols: Iterable[str]):
+        self._sync(kb)
+        for symbol in symbols:
+            var = kb.symbols.get(symbol)
+            if var is not None:
+                self.queried[var] = len(kb.arena)